@@ -1,8 +1,20 @@
+import argparse
 import pygame
 import pygame_gui
-import random
 import time
-import math
+
+import presortedness
+import sort_algorithms
+import workloads
+from bar_renderer import BarRenderer
+from column_renderer import ColumnRenderer
+from sort_scheduler import SortScheduler
+from sort_worker import SortWorker
+from hud import Label, TextPanel
+from perf_overlay import FrameStats, PerfOverlay, MetricsLog
+from instrumentation import Counters, instrument
+from run_timer import RunTimer
+from sort_ops import COMPARE, SWAP, WRITE, HIGHLIGHT, ALLOC
 
 
 # Screen and bar colors
@@ -14,12 +26,37 @@ BAR_COLOR = (255, 255, 255)
 WIDTH, HEIGHT = 800, 600
 BAR_WIDTH = 5
 BOTTOM_GUI_HEIGHT = 100  # Height for the bottom GUI section
+FPS = 60
+SORT_BUDGET = 0.5 / FPS  # Share of each frame the running sort may use
+
+# Bar mode draws one rect per element; large mode aggregates pixel columns
+MAX_ARRAY_SIZE = 800
+MIN_LARGE_SIZE, MAX_LARGE_SIZE = 1_000, 10_000_000
+
+# Presortedness is re-measured at most this often while sorting, and
+# less often when measuring would take more than DISORDER_SHARE of the time
+DISORDER_REFRESH = 0.5
+DISORDER_SHARE = 0.1
+DISORDER_LIMIT = 20_000  # Larger arrays are not measured live
+
+# Text at the top, bars below it with some space at the bottom
+HUD_RECT = pygame.Rect(0, 0, WIDTH, 170)
+BAR_FIELD = pygame.Rect(0, HUD_RECT.bottom, WIDTH, HEIGHT - HUD_RECT.bottom - 50)
+GUI_RECT = pygame.Rect(0, HEIGHT, WIDTH, BOTTOM_GUI_HEIGHT)
+OVERLAY_RECT = pygame.Rect(WIDTH - 270, BAR_FIELD.y + 10, 260, 150)
+
+# Created by init_display() rather than on import: worker processes
+# import this module too and must not open a window of their own
+screen = None
+manager = None
 
-# Initialize pygame
-pygame.init()
-screen = pygame.display.set_mode((WIDTH, HEIGHT + BOTTOM_GUI_HEIGHT))
-pygame.display.set_caption("Sorting Algorithm Visualizer")
-manager = pygame_gui.UIManager((WIDTH, HEIGHT + BOTTOM_GUI_HEIGHT))
+
+def init_display():
+    global screen, manager
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT + BOTTOM_GUI_HEIGHT))
+    pygame.display.set_caption("Sorting Algorithm Visualizer")
+    manager = pygame_gui.UIManager((WIDTH, HEIGHT + BOTTOM_GUI_HEIGHT))
 
 
 class SortVisualizer:
@@ -28,12 +65,73 @@ class SortVisualizer:
         self.array = list(range(1, self.array_size + 1))
         self.array_len = len(self.array)
         self.algo_name = "None"
-        self.start_time = 0
-        self.elapsed_time = 0
+        self.timer = RunTimer()  # Splits each run into algorithm/render/delay/events
+        self.last_timing = None
         self.is_sorting = False
+        self.frame_stats = FrameStats()  # Rolling per-frame costs for the overlay
+        self.overlay = PerfOverlay(OVERLAY_RECT, target_fps=FPS)
+        self.show_overlay = False
+        self.metrics_log = None  # MetricsLog when --metrics is given
+        self.show_disorder = True
+        self.disorder = None  # Last presortedness values, None when stale
+        self.next_disorder = 0.0
         
-        # Initialize array_writes before shuffle_array()
-        self.array_writes = 0  # Track array writes
+        # Initialize the counters, the renderer and the HUD before shuffle_array()
+        self.counters = Counters()  # Track array writes, reads, compares...
+        self.full_counters = True  # Off: only writes, counted from the operations
+        self.scheduler = SortScheduler(self.on_operation)
+        self.worker_mode = False  # Run sorts in a separate process
+        self.worker = None
+        self.worker_algorithm_ns = None  # Reported by the worker when it finishes
+        self.large_mode = False
+        self.distribution = "random"  # Input shape from workloads
+        self.seed = 0  # Same seed, same input: runs are reproducible
+        self.bar_renderer = BarRenderer(screen, BAR_FIELD)
+        self.column_renderer = ColumnRenderer(screen, BAR_FIELD)
+        self.renderer = self.bar_renderer
+
+        # HUD text is only re-rendered when the value shown changes
+        self.algo_label = Label("Algorithm: {}", (10, 10))
+        self.timer_label = Label("Time: {:.2f} seconds", (10, 40))
+        self.size_label = Label("Array Size: {}", (10, 70))
+        self.writes_label = Label("Array Writes: {}", (10, 100))
+        self.timing_label = Label("Algorithm {:.3f}s  Render {:.3f}s  Delay {:.3f}s  "
+                                  "Events {:.3f}s  Metrics {:.3f}s  Other {:.3f}s",
+                                  (10, 128), size=22)
+        self.speed_label = Label("Ops/frame: {}  (+/- speed, Space pause, N step)",
+                                 (WIDTH - 430, 40), size=22)
+        self.worker_label = Label("W - Worker process: {}", (WIDTH - 430, 60), size=22)
+        self.overlay_label = Label("P - Perf: {}", (WIDTH - 430, 12), size=22)
+        self.counts_label = Label("K - Reads: {}  Compares: {}  Swaps: {}  Aux: {}",
+                                  (WIDTH - 430, 100), size=22)
+        self.counts_off_label = Label("K - Counters: off", (WIDTH - 430, 100), size=22)
+        self.disorder_label = Label("X - Inv {:.0%}  Runs {:,}  Rem {:,}  Max disp {:,}  "
+                                    "Osc {:,}  ->  {}", (10, 148), size=22)
+        self.disorder_off_label = Label("X - Presortedness: {}", (10, 148), size=22)
+        self.input_label = Label("D - Input: {} (seed {}, R for a new one)", (WIDTH - 430, 80), size=22)
+
+        # The hotkey help never changes, so render it once
+        self.instructions = TextPanel([
+            (20, [
+                "Hotkeys for Algorithms:",
+                "I - Insertion Sort",
+                "B - Bubble Sort",
+                "S - Selection Sort",
+                "U - Integer Sort (counting/bucket)"
+            ]),
+            (WIDTH // 3 + 20, [
+                "O - Bogo Sort",
+                "H - Heap Sort",
+                "C - Cocktail Sort",
+                "L - Large Array Mode"
+            ]),
+            (WIDTH - 250, [
+                "Q - Quick Sort",
+                "M - Merge Sort",
+                "G - Grail Sort",
+                "R - Reset / Shuffle Array"
+            ]),
+        ], (WIDTH, BOTTOM_GUI_HEIGHT), line_height=18)
 
         self.shuffle_array()
 
@@ -41,398 +139,336 @@ class SortVisualizer:
         self.slider = pygame_gui.elements.UIHorizontalSlider(
             relative_rect=pygame.Rect((WIDTH - 310, 10), (300, 20)),
             start_value=self.array_size,
-            value_range=(5, 800),
+            value_range=(5, MAX_ARRAY_SIZE),
             manager=manager
         )
-        self.force_quit_button = None
-        
-    def reset_write_count(self):
-        self.array_writes = 0
 
-    def array_write(self, index, value):
-        """Controlled array write method to track writes"""
-        self.array[index] = value
-        self.array_writes += 1
+        # Widgets are created exactly once; draw_gui() only draws them
+        self.force_quit_button = pygame_gui.elements.UIButton(
+            relative_rect=pygame.Rect((WIDTH - 100, HEIGHT + BOTTOM_GUI_HEIGHT - 100), (90, 30)),
+            text='Force Quit',
+            manager=manager
+        )
+        
+    def reset_counters(self):
+        self.counters.reset()
 
     def update_array_size(self, new_size):
-        self.array_size = max(2, min(new_size, 800))
-        self.array = list(range(1, self.array_size + 1))
-        self.array_len = len(self.array)
+        self.stop_sort()
+        limit = MAX_LARGE_SIZE if self.large_mode else MAX_ARRAY_SIZE
+        self.array_size = max(2, min(new_size, limit))
         self.shuffle_array()
+        self.array_len = len(self.array)
 
     def start_sort(self, sort_function):
-        self.reset_write_count()  # Reset array writes count for new sort
-        self.shuffle_array()  # Shuffle array before each new sort
+        self.reset_counters()  # Reset the counters for the new sort
+        self.shuffle_array()  # Regenerate the same input before each new sort
         self.is_sorting = True
-        self.start_time = time.time()
-        sort_function()  # Run the sorting algorithm
-        self.elapsed_time = time.time() - self.start_time
-        self.is_sorting = False
-        self.draw_bars()  # Final update to show completion time
-
-
+        sort_function()  # Redraw with the new name and hand the algorithm over
+        self.timer.start()  # Only now, so the setup redraw is not part of the run
 
+    def finish_sort(self):
+        # Called from inside a timed section; update() stops the timer after it
+        self.is_sorting = False
+        self.disorder = None
+
+    def finish_timing(self):
+        """Stop the run's timer and return its breakdown in seconds"""
+        if self.worker_algorithm_ns is not None:
+            # The worker sorted concurrently with the drawing, so here the
+            # buckets overlap instead of adding up to the wall time
+            self.timer.ns["algorithm"] = self.worker_algorithm_ns
+        self.last_timing = self.timer.stop()
+        return self.last_timing
+
+    def stop_sort(self):
+        self.scheduler.stop()
+        if self.worker:
+            self.release_worker()
+        self.is_sorting = False
+        self.timer.reset()
+
+    def update(self):
+        """Advance the running sort by one frame's worth and redraw"""
+        stats = self.frame_stats
+        if self.worker:
+            writes = self.counters.writes
+            with self.timer.section("render"):  # Diffing the shared array is drawing work
+                self.sample_worker()
+            stats.ops += self.counters.writes - writes  # The worker only reports writes
+        else:
+            with self.timer.section("algorithm"), stats.section("algorithm"):
+                stats.ops += self.scheduler.tick(SORT_BUDGET)
+        with self.timer.section("metrics"), stats.section("metrics"):
+            self.measure_disorder()
+        with self.timer.section("render"):
+            if self.is_sorting:
+                self.present_frame()
+            else:
+                self.draw_bars()
+        if self.timer.running and not self.is_sorting:
+            self.finish_timing()
+        stats.end_frame()
+        if self.metrics_log:
+            self.metrics_log.update(stats, algorithm=self.algo_name, array_size=self.array_size,
+                                    sorting=self.is_sorting)
+
+    def slider_size(self, value):
+        """Array size for a slider position (logarithmic in large mode)"""
+        if not self.large_mode:
+            return int(value)
+        fraction = (value - 5) / (MAX_ARRAY_SIZE - 5)
+        return int(MIN_LARGE_SIZE * (MAX_LARGE_SIZE / MIN_LARGE_SIZE) ** fraction)
+
+    def toggle_large_mode(self):
+        self.large_mode = not self.large_mode
+        self.renderer = self.column_renderer if self.large_mode else self.bar_renderer
+        self.update_array_size(self.slider_size(self.slider.get_current_value()))
 
     def shuffle_array(self):
-        random.shuffle(self.array)
+        """Generate the array from the current distribution and seed"""
+        self.stop_sort()
+        values = workloads.generate(self.distribution, self.array_size, self.seed)
+        self.array = values if self.large_mode else values.tolist()
+        self.renderer.attach(self.array)
+        self.disorder = None
         self.draw_bars()
 
-    def draw_bars(self, highlighted_indices=None):
-        screen.fill(BLACK)
-        font = pygame.font.SysFont(None, 30)
-        
-        # Draw algorithm name
-        algo_text = font.render(f"Algorithm: {self.algo_name}", True, WHITE)
-        screen.blit(algo_text, (10, 10))
-        
-        # Draw timer
-        if self.is_sorting:
-            current_time = time.time() - self.start_time
-        else:
-            current_time = self.elapsed_time
-        
-        timer_text = font.render(f"Time: {current_time:.2f} seconds", True, WHITE)
-        screen.blit(timer_text, (10, 40))
+    def reseed(self):
+        self.seed += 1
+        self.shuffle_array()
 
-        # Draw array size label
-        size_text = font.render(f"Array Size: {self.array_size}", True, WHITE)
-        screen.blit(size_text, (10, 70))
+    def next_distribution(self):
+        names = list(workloads.DISTRIBUTIONS)
+        self.distribution = names[(names.index(self.distribution) + 1) % len(names)]
+        self.shuffle_array()
 
-        # Calculate bar dimensions to fill screen width
-        padding_top = 100  # Space for text at top
-        padding_bottom = 50  # Space at bottom
-        available_height = HEIGHT - padding_top - padding_bottom
-        
-        # Calculate bar width to fill entire screen width
-        bar_width = WIDTH / self.array_size  # Divide full width by number of bars
-        
-        # Scale heights to fill available vertical space
-        max_value = max(self.array)
-        height_scale = available_height / max_value
-
-        writes_text = font.render(f"Array Writes: {self.array_writes}", True, WHITE)
-        screen.blit(writes_text, (10, 100))
-
-        for i, value in enumerate(self.array):
-            # Calculate bar position and dimensions
-            x = i * bar_width
-            bar_height = value * height_scale
-            y = HEIGHT - padding_bottom - bar_height
-
-            # Draw bar
-            if highlighted_indices and i in highlighted_indices:
-                color = (255, 0, 0)  # Red for highlighted bars
-            else:
-                color = BAR_COLOR
-                
-            # Draw bar with no gaps
-            pygame.draw.rect(screen, color, (x, y, bar_width, bar_height))
+    def draw_hud(self):
+        screen.fill(BLACK, HUD_RECT)
+
+        # Live while sorting, frozen at the final breakdown afterwards
+        times = self.timer.breakdown()
+
+        self.algo_label.draw(screen, self.algo_name)
+        self.timer_label.draw(screen, times["wall"])
+        self.timing_label.draw(screen, times["algorithm"], times["render"], times["delay"],
+                               times["events"], times["metrics"], times["other"])
+        self.size_label.draw(screen, self.array_size)
+        self.writes_label.draw(screen, self.counters.writes)
+        if self.full_counters:
+            self.counts_label.draw(screen, self.counters.reads, self.counters.compares,
+                                   self.counters.swaps, self.counters.aux_slots)
+        else:
+            self.counts_off_label.draw(screen)
+        self.speed_label.draw(screen, self.scheduler.speed_label())
+        self.worker_label.draw(screen, "on" if self.worker_mode else "off")
+        self.overlay_label.draw(screen, "on" if self.show_overlay else "off")
+        self.input_label.draw(screen, self.distribution, self.seed)
+        self.draw_disorder()
+
+    def measure_disorder(self):
+        """Re-measure the presortedness when stale, and a few times a second while sorting"""
+        if not self.show_disorder or len(self.array) > DISORDER_LIMIT:
+            return
+        start = time.perf_counter()
+        if self.disorder is None or self.is_sorting and start >= self.next_disorder:
+            metrics = presortedness.measure(self.array)
+            self.disorder = (metrics["inversion_ratio"], metrics["runs"], metrics["rem"],
+                             metrics["max_displacement"], metrics["oscillation"],
+                             presortedness.suggest_algorithm(metrics))
+            took = time.perf_counter() - start
+            self.next_disorder = start + max(DISORDER_REFRESH, took / DISORDER_SHARE)
+
+    def draw_disorder(self):
+        """The presortedness from the last measure_disorder()"""
+        if not self.show_disorder:
+            self.disorder_off_label.draw(screen, "off")
+        elif len(self.array) > DISORDER_LIMIT:
+            self.disorder_off_label.draw(screen, f"not measured above {DISORDER_LIMIT:,} items")
+        elif self.disorder is None:
+            self.disorder_off_label.draw(screen, "measuring...")
+        else:
+            self.disorder_label.draw(screen, *self.disorder)
 
-        self.draw_gui()
-        pygame.display.flip()
+    def toggle_disorder(self):
+        self.show_disorder = not self.show_disorder
+        self.disorder = None
 
+    def draw_bars(self, highlighted_indices=None):
+        """Redraw the whole window"""
+        screen.fill(BLACK)
+        with self.frame_stats.section("hud"):
+            self.draw_hud()
+        with self.frame_stats.section("bars"):
+            self.renderer.highlight(highlighted_indices)
+            self.renderer.draw_all()
+        with self.frame_stats.section("gui"):
+            self.draw_gui()
+        self.draw_overlay()
+        with self.frame_stats.section("bars"):
+            pygame.display.flip()
 
+    def present_frame(self):
+        """Push only the HUD, GUI and the bars that changed since the last frame"""
+        with self.frame_stats.section("hud"):
+            self.draw_hud()
+        with self.frame_stats.section("gui"):
+            screen.fill(BLACK, GUI_RECT)
+            self.draw_gui()
+        with self.frame_stats.section("bars"):
+            self.renderer.present(extra_rects=[HUD_RECT, GUI_RECT],
+                                  draw_over=self.draw_overlay)
 
     def draw_gui(self):
-        font = pygame.font.SysFont(None, 24)
         manager.draw_ui(screen)
-        instructions_left = [
-            "Hotkeys for Algorithms:",
-            "I - Insertion Sort",
-            "B - Bubble Sort",
-            "S - Selection Sort"
-        ]
-        instructions_middle = [
-            "O - Bogo Sort",
-            "H - Heap Sort",  # Suggest adding Heap Sort
-            "C - Cocktail Sort"  # Suggest adding Cocktail Sort
-        ]
-        instructions_right = [
-            "Q - Quick Sort",
-            "M - Merge Sort",
-            "G - Grail Sort",
-            "R - Reset / Shuffle Array"
-        ]
-
-        # Positioning parameters
-        x_offset_left = 20
-        x_offset_middle = WIDTH // 3 + 20
-        x_offset_right = WIDTH - 250
-        y_offset = HEIGHT + 10
-
-        # Render and blit instructions for left column
-        for instruction in instructions_left:
-            text_surface = font.render(instruction, True, WHITE)
-            screen.blit(text_surface, (x_offset_left, y_offset))
-            y_offset += 20
-
-        # Reset y_offset for middle column
-        y_offset = HEIGHT + 10
-
-        # Render and blit instructions for middle column
-        for instruction in instructions_middle:
-            text_surface = font.render(instruction, True, WHITE)
-            screen.blit(text_surface, (x_offset_middle, y_offset))
-            y_offset += 20
-
-        # Reset y_offset for right column
-        y_offset = HEIGHT + 10
-
-        # Render and blit instructions for right column
-        for instruction in instructions_right:
-            text_surface = font.render(instruction, True, WHITE)
-            screen.blit(text_surface, (x_offset_right, y_offset))
-            y_offset += 20
-
-    # Add a force quit button
-        self.force_quit_button = pygame_gui.elements.UIButton(
-            relative_rect=pygame.Rect((WIDTH - 100, HEIGHT + BOTTOM_GUI_HEIGHT - 100), (90, 30)),
-            text='Force Quit',
-            manager=manager
-        )
+        self.instructions.draw(screen, (0, HEIGHT + 6))
+
+    def draw_overlay(self):
+        """Paint the performance overlay on top of the bars, if it is shown"""
+        if not self.show_overlay:
+            return []
+        return [self.overlay.draw(screen, self.frame_stats)]
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        self.draw_bars()  # Repaint the bars the overlay covered
 
     def set_algorithm(self, algo_name):
         self.algo_name = algo_name
         self.draw_bars()  # Update the display with the new algorithm name
 
+    def on_operation(self, op):
+        """Account for one operation from the running sort"""
+        code = op[0]
+        if self.full_counters:
+            self.counters.count(op)  # Reads and writes come from the array itself
+        elif code == SWAP:
+            self.counters.writes += 2
+        elif code == WRITE:
+            self.counters.writes += 1
+        if code == COMPARE or code == ALLOC:
+            return  # Only array changes and highlights are drawn
+        self.renderer.touch(op)
+
+    def toggle_counters(self):
+        self.stop_sort()
+        self.full_counters = not self.full_counters
+
+    def play(self, algorithm):
+        """Run an algorithm from sort_algorithms from the main loop or in a worker"""
+        self.worker_algorithm_ns = None
+        if self.worker_mode:
+            self.worker = SortWorker(self.array, algorithm)
+            self.array = self.worker.array  # Draw straight from shared memory
+            self.renderer.attach(self.array)
+            self.worker.start()
+        else:
+            counters = self.counters if self.full_counters else None
+            operations = algorithm(instrument(self.array, counters))
+            self.scheduler.start(operations, on_finish=self.finish_sort)
+
+    def sample_worker(self):
+        """Pick up whatever the worker process changed since the last frame"""
+        changed = self.worker.changed_indices()
+        if len(changed) > 64:
+            self.renderer.touch((HIGHLIGHT, int(changed[0]), int(changed[-1]) + 1))
+        else:
+            for i in changed:
+                self.renderer.touch((WRITE, int(i), 0))
+        self.counters.writes = self.worker.writes
+        if not self.worker.running:
+            self.worker_algorithm_ns = self.worker.algorithm_ns
+            self.release_worker()
+            self.finish_sort()
+
+    def release_worker(self):
+        """Stop the worker and take the array back out of shared memory"""
+        values = self.worker.result()
+        self.array = values if self.large_mode else values.tolist()
+        self.renderer.attach(self.array)
+        self.worker.close()
+        self.worker = None
+
+    def shutdown(self):
+        self.stop_sort()
+        if self.metrics_log:
+            self.metrics_log.close()
+            self.metrics_log = None
+
+    def toggle_worker_mode(self):
+        self.stop_sort()
+        self.worker_mode = not self.worker_mode
+
     def bubble_sort(self):
-        self.reset_write_count()
+        self.reset_counters()
         self.set_algorithm("Bubble Sort")
-        n = len(self.array)
-        for i in range(n):
-            for j in range(0, n - i - 1):
-                pygame.event.pump()  # Allow Pygame to process events
-                if self.array[j] > self.array[j + 1]:
-                    temp = self.array[j]
-                    self.array_write(j, self.array[j + 1])
-                    self.array_write(j + 1, temp)
-                    self.draw_bars([j, j + 1])
-                    pygame.display.flip()  # Refresh display
-                    time.sleep(0.01)
+        self.play(sort_algorithms.bubble_sort)
 
     def selection_sort(self):
-        self.reset_write_count()
+        self.reset_counters()
         self.set_algorithm("Selection Sort")
-        n = len(self.array)
-        for i in range(n):
-            min_index = i
-            for j in range(i + 1, n):
-                pygame.event.pump()
-                if self.array[j] < self.array[min_index]:
-                    min_index = j
-            temp = self.array[i]
-            self.array_write(i, self.array[min_index])
-            self.array_write(min_index, temp)
-            self.draw_bars([i, min_index])
-            pygame.display.flip()
-            time.sleep(0.01)
+        self.play(sort_algorithms.selection_sort)
 
     def quick_sort(self):
-        self.reset_write_count()
+        self.reset_counters()
         self.set_algorithm("Quick Sort")
-
-        def partition(low, high):
-            pivot = self.array[high]
-            i = low - 1
-
-            for j in range(low, high):
-                pygame.event.pump()  # Allow Pygame to process events
-                if self.array[j] <= pivot:
-                    i += 1
-                    # Swap elements and update the display
-                    temp = self.array[i]
-                    self.array_write(i, self.array[j])
-                    self.array_write(j, temp)
-                    self.draw_bars([i, j])
-                    pygame.display.flip()
-                    time.sleep(0.01)
-
-            # Swap pivot to correct position
-            self.array[i + 1], self.array[high] = self.array[high], self.array[i + 1]
-            self.draw_bars([i + 1, high])
-            pygame.display.flip()
-            time.sleep(0.01)
-
-            return i + 1
-
-        def quick_sort_recursive(low, high):
-            if low < high:
-                pi = partition(low, high)
-                quick_sort_recursive(low, pi - 1)
-                quick_sort_recursive(pi + 1, high)
-
-        quick_sort_recursive(0, len(self.array) - 1)
-
+        self.play(sort_algorithms.quick_sort)
 
     def merge_sort(self):
-        self.reset_write_count()
+        self.reset_counters()
         self.set_algorithm("Merge Sort")
-        
-        def merge(start, mid, end):
-            # In-place merge using only the main array
-            left = start
-            right = mid + 1
-            
-            # If already sorted, no need to merge
-            if self.array[mid] <= self.array[right]:
-                return
-            
-            while left <= mid and right <= end:
-                pygame.event.pump()
-                
-                if self.array[left] <= self.array[right]:
-                    left += 1
-                else:
-                    # Rotate the elements
-                    temp = self.array[right]
-                    
-                    # Shift elements to the right
-                    for i in range(right, left, -1):
-                        self.array_write(i, self.array[i-1])
-                    
-                    # Insert the temp element
-                    self.array_write(left, temp)
-                    
-                    left += 1
-                    mid += 1
-                    right += 1
-                    
-                    self.draw_bars(highlighted_indices=[left-1, right-1])
-                    pygame.display.flip()
-                    time.sleep(0.01)
-        
-        def merge_sort_recursive(start, end):
-            if start >= end:
-                return
-            
-            mid = (start + end) // 2
-            merge_sort_recursive(start, mid)
-            merge_sort_recursive(mid + 1, end)
-            merge(start, mid, end)
-        
-        merge_sort_recursive(0, len(self.array) - 1)
+        self.play(sort_algorithms.merge_sort)
 
     def insertion_sort(self):
-            self.reset_write_count()
-            self.set_algorithm("Insertion Sort")
-            for i in range(1, len(self.array)):
-                key = self.array[i]
-                j = i - 1
-                while j >= 0 and key < self.array[j]:
-                    pygame.event.pump()
-                    self.array_write(j + 1, self.array[j])
-                    j -= 1
-                    self.draw_bars([j, j + 1])
-                    pygame.display.flip()
-                    time.sleep(0.01)
-                self.array_write(j + 1, key)
-                self.draw_bars([j + 1])
+        self.reset_counters()
+        self.set_algorithm("Insertion Sort")
+        self.play(sort_algorithms.insertion_sort)
 
     def grail_sort(self):
-        self.reset_write_count()
+        self.reset_counters()
         self.set_algorithm("Grail Sort")
-        n = len(self.array)
-        if n <= 1:
-            return
-            
-        block_size = max(1, int(math.sqrt(n)))
-        num_blocks = math.ceil(n / block_size)
-
-        try:
-            # Step 1: Sort each block using insertion sort
-            for i in range(num_blocks):
-                pygame.event.pump()  # Allow pygame to process events
-                start = i * block_size
-                end = min((i + 1) * block_size, n)
-                self.insertion_sort_grail(start, end - 1)
-                self.draw_bars(highlighted_indices=range(start, end))
-                time.sleep(0.01)
-
-            # Step 2: Perform a multi-way merge in place
-            step = block_size
-            while step < n:
-                pygame.event.pump()  # Allow pygame to process events
-                for start in range(0, n, 2 * step):
-                    mid = min(start + step - 1, n - 1)
-                    end = min(start + 2 * step - 1, n - 1)
-                    if mid < end:
-                        self.merge_in_place(start, mid, end)
-                step *= 2
-                self.draw_bars()
-                time.sleep(0.01)
-        except Exception as e:
-            print(f"Error in grail sort: {e}")
-
-    def merge_in_place(self, start, mid, end):
-        left = start
-        right = mid + 1
-        
-        # Only proceed if there are elements to merge
-        while left <= mid and right <= end:
-            pygame.event.pump()  # Allow pygame to process events
-            
-            if self.array[left] <= self.array[right]:
-                left += 1
-            else:
-                value = self.array[right]
-                # Make sure we don't exceed array bounds
-                if left < right:
-                    # Shift elements only within valid bounds
-                    for i in range(right, left, -1):
-                        self.array_write(i, self.array[i - 1])
-                    self.array_write(left, value)
-                    
-                left += 1
-                mid += 1
-                right += 1
-                
-                self.draw_bars(highlighted_indices=[left-1, right-1])
-                pygame.display.flip()
-                time.sleep(0.01)
-
-    # Insertion Sort (for sorting blocks)
-    def insertion_sort_grail(self, start, end):
-        for i in range(start + 1, end + 1):
-            key = self.array[i]
-            j = i - 1
-            while j >= start and self.array[j] > key:
-                self.array_write(j + 1, self.array[j])
-                j -= 1
-            self.array_write(j + 1, key)
-            # Highlight the bars that are being compared/swapped
-            self.draw_bars(highlighted_indices=[i, j + 1])
-            time.sleep(0.01)
+        self.play(sort_algorithms.grail_sort)
 
     def bogo_sort(self):
-        self.reset_write_count()
+        self.reset_counters()
         self.set_algorithm("Bogo Sort")
-        
-        def is_sorted():
-            for i in range(1, len(self.array)):
-                if self.array[i] < self.array[i-1]:
-                    return False
-            return True
-        
-        attempts = 0        
-        while not is_sorted():
-            pygame.event.pump()  # Allow Pygame to process events
-            
-            # Randomly shuffle the array
-            random.shuffle(self.array)
-            attempts += 1
-            
-            # Update visualization
-            self.draw_bars()
-            pygame.display.flip()
-            time.sleep(0.1)  # Slow down visualization
-
-def main():
+        self.play(sort_algorithms.bogo_sort)
+
+    def integer_sort(self):
+        self.reset_counters()
+        self.set_algorithm("Integer Sort")
+        self.play(sort_algorithms.integer_sort)
+
+    def heap_sort(self):
+        self.reset_counters()
+        self.set_algorithm("Heap Sort (Bottom-Up)")
+        self.play(sort_algorithms.bottom_up_heap_sort)
+
+    def cocktail_sort(self):
+        self.reset_counters()
+        self.set_algorithm("Cocktail Shaker Sort")
+        self.play(sort_algorithms.cocktail_shaker_sort)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sorting algorithm visualizer")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="append frame metrics to PATH as JSON lines once a second")
+    args = parser.parse_args(argv)
+
+    init_display()
     running = True
     visualizer = SortVisualizer()
+    if args.metrics:
+        visualizer.metrics_log = MetricsLog(args.metrics)
     clock = pygame.time.Clock()
 
     while running:
-        time_delta = clock.tick(60)/1000.0
+        # Time spent waiting for the frame cap and in event handling is
+        # charged to the running sort's timer, if any
+        delay_start = time.perf_counter_ns()
+        time_delta = clock.tick(FPS)/1000.0
+        events_start = time.perf_counter_ns()
+        visualizer.timer.add("delay", events_start - delay_start)
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
@@ -440,11 +476,12 @@ def main():
             if event.type == pygame_gui.UI_BUTTON_PRESSED:
                 if event.ui_element == visualizer.force_quit_button:
                     running = False
+                    visualizer.shutdown()  # Kills a worker process right away
                     pygame.quit()
                     return
             if event.type == pygame_gui.UI_HORIZONTAL_SLIDER_MOVED:
                 if event.ui_element == visualizer.slider:
-                    new_size = int(event.value)
+                    new_size = visualizer.slider_size(event.value)
                     visualizer.update_array_size(new_size)
 
             if event.type == pygame.KEYDOWN:
@@ -462,16 +499,44 @@ def main():
                     visualizer.start_sort(visualizer.merge_sort)
                 elif event.key == pygame.K_g:
                     visualizer.start_sort(visualizer.grail_sort)
+                elif event.key == pygame.K_u:
+                    visualizer.start_sort(visualizer.integer_sort)
+                elif event.key == pygame.K_h:
+                    visualizer.start_sort(visualizer.heap_sort)
+                elif event.key == pygame.K_c:
+                    visualizer.start_sort(visualizer.cocktail_sort)
+                elif event.key == pygame.K_l:
+                    visualizer.toggle_large_mode()
+                elif event.key == pygame.K_w:
+                    visualizer.toggle_worker_mode()
+                elif event.key == pygame.K_k:
+                    visualizer.toggle_counters()
+                elif event.key == pygame.K_p:
+                    visualizer.toggle_overlay()
+                elif event.key == pygame.K_x:
+                    visualizer.toggle_disorder()
+                elif event.key == pygame.K_SPACE:
+                    visualizer.scheduler.toggle_pause()
+                elif event.key == pygame.K_n:
+                    visualizer.scheduler.step()
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    visualizer.scheduler.faster()
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    visualizer.scheduler.slower()
+                elif event.key == pygame.K_d:
+                    visualizer.next_distribution()
                 elif event.key == pygame.K_r:
-                    visualizer.shuffle_array()
-                    visualizer.elapsed_time = 0
+                    visualizer.reseed()
 
             manager.process_events(event)
 
         manager.update(time_delta)
-        visualizer.draw_bars()
-        pygame.display.flip()
+        # A run started by one of these events is only charged from its start
+        events_from = max(events_start, visualizer.timer.started or 0)
+        visualizer.timer.add("events", time.perf_counter_ns() - events_from)
+        visualizer.update()
 
+    visualizer.shutdown()
     pygame.quit()
 if __name__ == "__main__":
     main()
@@ -0,0 +1,96 @@
+import pygame
+
+from sort_ops import touched_indices
+
+BAR_COLOR = (255, 255, 255)
+HIGHLIGHT_COLOR = (255, 0, 0)
+BACKGROUND = (0, 0, 0)
+
+
+class BarRenderer:
+    """Draws an array as bars, redrawing only the columns that changed.
+
+    Operations are fed in with touch(); they only mark bar columns dirty.
+    present() then redraws the dirty columns and hands just those
+    rectangles to pygame.display.update(); the caller's frame clock
+    decides how often that happens.
+    """
+
+    def __init__(self, surface, field):
+        self.surface = surface
+        self.field = pygame.Rect(field)
+        self.array = []
+        self.dirty = set()
+        self.highlighted = set()   # Highlighted in the frame on screen
+        self.pending = set()       # Touched since the last frame
+        self.max_value = 1
+
+    def attach(self, array):
+        """Start drawing a (possibly new) array from scratch"""
+        self.array = array
+        self.max_value = max(array, default=1) or 1
+        self.dirty.clear()
+        self.highlighted.clear()
+        self.pending.clear()
+
+    def touch(self, op):
+        """Mark the columns an operation refers to as dirty and highlighted"""
+        indices = touched_indices(op)
+        self.dirty.update(indices)
+        self.pending.update(indices)
+
+    def highlight(self, indices):
+        self.pending.update(indices or ())
+
+    def column(self, i):
+        bar_width = self.field.width / len(self.array)
+        x0 = self.field.x + int(i * bar_width)
+        x1 = max(self.field.x + int((i + 1) * bar_width), x0 + 1)
+        return pygame.Rect(x0, self.field.y, x1 - x0, self.field.height)
+
+    def _draw_column(self, i):
+        rect = self.column(i)
+        self.surface.fill(BACKGROUND, rect)
+        bar_height = int(self.array[i] * self.field.height / self.max_value)
+        color = HIGHLIGHT_COLOR if i in self.highlighted else BAR_COLOR
+        self.surface.fill(color, (rect.x, rect.bottom - bar_height, rect.width, bar_height))
+        return rect
+
+    def _next_frame(self):
+        # Un-highlight last frame's bars and highlight this frame's
+        self.dirty |= self.highlighted
+        self.highlighted, self.pending = self.pending, self.highlighted
+        self.pending.clear()
+        self.dirty |= self.highlighted
+
+    def draw_all(self):
+        """Redraw every bar (used for full-screen frames)"""
+        self._next_frame()
+        self.dirty.clear()
+        self.surface.fill(BACKGROUND, self.field)
+        for i in range(len(self.array)):
+            self._draw_column(i)
+        return [self.field]
+
+    def draw_dirty(self):
+        """Redraw only the dirty columns and return their rectangles"""
+        self._next_frame()
+        n = len(self.array)
+        if any(self.array[i] > self.max_value for i in self.dirty if i < n):
+            self.max_value = max(self.array)
+            return self.draw_all()
+        rects = [self._draw_column(i) for i in self.dirty if i < n]
+        self.dirty.clear()
+        return rects
+
+    def present(self, extra_rects=(), draw_over=None):
+        """Push the dirty columns to the display.
+
+        draw_over, if given, is called after the bars are drawn so it can
+        paint on top of them; it returns the rectangles it drew.
+        """
+        rects = self.draw_dirty()
+        rects.extend(extra_rects)
+        if draw_over:
+            rects.extend(draw_over())
+        pygame.display.update(rects)
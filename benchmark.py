@@ -0,0 +1,193 @@
+"""Headless benchmark of the algorithms in sort_algorithms.
+
+Runs every selected algorithm over a matrix of sizes and input shapes and
+reports median/p95 wall time, operation counts and peak memory as JSON or
+CSV, e.g.
+
+    python benchmark.py --sizes 100 1000 10000 --repeat 5 --format csv
+"""
+import argparse
+import csv
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime, timezone
+from itertools import islice
+
+import instrumentation
+import sort_algorithms
+import workloads
+from instrumentation import Counters, counted, instrument
+
+# O(n^2) algorithms are skipped above --quadratic-limit elements
+QUADRATIC = {
+    "Bubble Sort", "Selection Sort", "Insertion Sort", "In-Place Merge Sort",
+    "Odd-Even Sort", "Cocktail Shaker Sort",
+}
+BOGO_LIMIT = 8
+CHUNK = 4096  # Operations drained between time limit checks
+
+FIELDS = ["algorithm", "distribution", "size", "repeat", "median_s", "p95_s", "min_s",
+          *instrumentation.FIELDS, "peak_bytes", "error"]
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def drain(operations, deadline):
+    """Like sort_ops.run, but give up once perf_counter passes deadline"""
+    operations = iter(operations)
+    while deque(islice(operations, CHUNK), maxlen=1):
+        if time.perf_counter() > deadline:
+            raise TimeoutError("time limit exceeded")
+
+
+def count_operations(algorithm, data, time_limit):
+    """Counters from one fully instrumented (and untimed) run"""
+    arr = list(data)
+    counters = Counters()
+    deadline = time.perf_counter() + time_limit
+    operations = counted(algorithm(instrument(arr, counters)), counters)
+    for i, _ in enumerate(operations):
+        if i % CHUNK == 0 and time.perf_counter() > deadline:
+            raise TimeoutError("time limit exceeded")
+    if not sort_algorithms.is_sorted(arr):
+        raise AssertionError("algorithm did not sort its input")
+    return counters
+
+
+def peak_memory(algorithm, data, time_limit):
+    arr = list(data)
+    tracemalloc.start()
+    try:
+        drain(algorithm(arr), time.perf_counter() + time_limit)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def time_runs(algorithm, data, warmup, repeat, time_limit):
+    for _ in range(warmup):
+        drain(algorithm(list(data)), time.perf_counter() + time_limit)
+    timings = []
+    for _ in range(repeat):
+        arr = list(data)
+        start = time.perf_counter_ns()
+        drain(algorithm(arr), time.perf_counter() + time_limit)
+        timings.append((time.perf_counter_ns() - start) / 1e9)
+    return timings
+
+
+def skipped(name, size, quadratic_limit):
+    if name == "Bogo Sort":
+        return size > BOGO_LIMIT
+    return name in QUADRATIC and size > quadratic_limit
+
+
+def benchmark(names, sizes, distributions, warmup=1, repeat=5, seed=0,
+              quadratic_limit=5000, time_limit=60.0, memory=True, log=None):
+    """Yield one result dict per (algorithm, distribution, size) cell"""
+    for distribution in distributions:
+        for size in sizes:
+            data = workloads.generate_list(distribution, size, seed)
+            for name in names:
+                if skipped(name, size, quadratic_limit):
+                    continue
+                algorithm = sort_algorithms.ALGORITHMS[name]
+                if log:
+                    log(f"{name:<22} {distribution:<10} n={size}")
+                try:
+                    timings = time_runs(algorithm, data, warmup, repeat, time_limit)
+                    counts = count_operations(algorithm, data, time_limit)
+                    peak = peak_memory(algorithm, data, time_limit) if memory else None
+                except (RecursionError, TimeoutError, AssertionError) as exc:
+                    # e.g. a run past --time-limit or too deep for Python's stack
+                    yield {"algorithm": name, "distribution": distribution, "size": size,
+                           "repeat": repeat, "error": f"{type(exc).__name__}: {exc}"}
+                    continue
+                yield {
+                    "algorithm": name,
+                    "distribution": distribution,
+                    "size": size,
+                    "repeat": repeat,
+                    "median_s": statistics.median(timings),
+                    "p95_s": percentile(timings, 0.95),
+                    "min_s": min(timings),
+                    **counts.as_dict(),
+                    "peak_bytes": peak,
+                    "error": None,
+                }
+
+
+def write_json(results, args, out):
+    json.dump({
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }, out, indent=2)
+    out.write("\n")
+
+
+def write_csv(results, out):
+    writer = csv.DictWriter(out, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(results)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the sorting algorithms headless")
+    parser.add_argument("--algorithms", nargs="+", default=list(sort_algorithms.ALGORITHMS),
+                        choices=list(sort_algorithms.ALGORITHMS), metavar="NAME",
+                        help="algorithm names as listed in sort_algorithms.ALGORITHMS")
+    parser.add_argument("--sizes", nargs="+", type=lambda s: int(float(s)),
+                        default=[100, 1000, 10000], help="array sizes (1e5 style allowed)")
+    parser.add_argument("--distributions", nargs="+",
+                        default=["random", "sorted", "reversed", "few-unique"],
+                        choices=list(workloads.DISTRIBUTIONS))
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quadratic-limit", type=int, default=5000,
+                        help="largest size to run O(n^2) algorithms on")
+    parser.add_argument("--time-limit", type=float, default=60.0,
+                        help="seconds after which a single run is abandoned")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the tracemalloc peak memory run")
+    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("--output", "-o", help="file to write instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = list(benchmark(args.algorithms, args.sizes, args.distributions,
+                             warmup=args.warmup, repeat=args.repeat, seed=args.seed,
+                             quadratic_limit=args.quadratic_limit,
+                             time_limit=args.time_limit,
+                             memory=not args.no_memory,
+                             log=lambda line: print(line, file=sys.stderr)))
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "json":
+            write_json(results, args, out)
+        else:
+            write_csv(results, out)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import numpy as np
+import pygame
+
+from bar_renderer import BarRenderer, BAR_COLOR, HIGHLIGHT_COLOR, BACKGROUND
+from sort_ops import ALLOC, HIGHLIGHT, WRITE
+
+BAND_COLOR = (110, 110, 110)
+
+
+class ColumnRenderer(BarRenderer):
+    """Draws arrays far larger than the window is wide.
+
+    Elements are grouped into one bucket per pixel column and each column
+    shows its bucket's minimum (solid), the min..max band (grey) and the
+    mean (a red tick when the column was touched).  The whole field is
+    built as a NumPy image and blitted in one go with pygame.surfarray,
+    so the cost per frame is a handful of vectorized passes over the array.
+    """
+
+    def __init__(self, surface, field):
+        super().__init__(surface, field)
+        self.target = surface.subsurface(self.field)
+        self.image = np.zeros((self.field.width, self.field.height, 3), dtype=np.uint8)
+        # Pixel row numbers counted from the bottom of the field
+        self.rows = np.arange(self.field.height - 1, -1, -1)[None, :]
+        self.dirty = False
+        self.min_value = 0
+
+    def attach(self, array):
+        self.array = np.asarray(array)
+        n = len(self.array)
+        columns = min(self.field.width, max(n, 1))
+        # First element of each pixel column's bucket
+        self.starts = (np.arange(columns) * n) // columns
+        self.column_width = self.field.width / columns
+        self.min_value = min(0, int(self.array.min())) if n else 0
+        self.max_value = int(self.array.max()) if n else 1
+        self.highlighted.clear()
+        self.pending.clear()
+        self.dirty = True
+
+    def _columns(self, lo, hi):
+        n = len(self.array)
+        columns = len(self.starts)
+        return range(lo * columns // n, (hi - 1) * columns // n + 1)
+
+    def touch(self, op):
+        code, a, b = op
+        if code == ALLOC:
+            return
+        self.dirty = True
+        if code == HIGHLIGHT:
+            self.pending.update(self._columns(a, b))
+        else:
+            self.pending.update(self._columns(a, a + 1))
+            if code != WRITE:  # Writes carry a value, not a second index
+                self.pending.update(self._columns(b, b + 1))
+
+    def highlight(self, indices):
+        for i in indices or ():
+            self.pending.update(self._columns(i, i + 1))
+
+    def aggregate(self):
+        """Per-column (min, max, mean) of the array"""
+        lows = np.minimum.reduceat(self.array, self.starts)
+        highs = np.maximum.reduceat(self.array, self.starts)
+        counts = np.diff(np.append(self.starts, len(self.array)))
+        means = np.add.reduceat(self.array, self.starts, dtype=np.float64) / counts
+        return lows, highs, means
+
+    def draw_all(self):
+        self.highlighted, self.pending = self.pending, self.highlighted
+        self.pending.clear()
+        self.dirty = False
+        self.image[:] = BACKGROUND
+        if len(self.array):
+            lows, highs, means = self.aggregate()
+            self.max_value = max(self.max_value, int(highs.max()))
+            scale = self.field.height / (self.max_value - self.min_value or 1)
+            lows, highs, means = (((v - self.min_value) * scale).astype(np.int64)[:, None]
+                                  for v in (lows, highs, means))
+            # Widen the bucket image to the field when there are fewer
+            # elements than pixel columns
+            spread = (np.arange(self.field.width) / self.column_width).astype(np.int64)
+            lows, highs, means = lows[spread], highs[spread], means[spread]
+            self.image[self.rows < highs] = BAND_COLOR
+            self.image[self.rows < lows] = BAR_COLOR
+            if self.highlighted:
+                touched = np.isin(spread, np.fromiter(self.highlighted, np.int64))[:, None]
+                self.image[touched & (self.rows == np.maximum(means - 1, 0))] = HIGHLIGHT_COLOR
+        pygame.surfarray.blit_array(self.target, self.image)
+        return [self.field]
+
+    def draw_dirty(self):
+        if not self.dirty and not self.highlighted:
+            return []
+        return self.draw_all()
@@ -0,0 +1,636 @@
+"""GrailSort: stable, in-place O(n log n) block merge sort.
+
+A port of Andrey Astrelin's GrailSort.  The sort first collects up to
+2*sqrt(n) distinct values ("keys") at the front of the array.  About
+sqrt(n) of them act as an internal buffer that merges swap into, so
+values are never lost; the others tag the blocks of each pair of runs so
+the blocks can be sorted by their first value and merged locally while
+staying stable.  With too few distinct values it falls back to merges
+by rotation, which are still in place.
+
+The *_buffer variants additionally allocate a fixed external buffer
+(512 items, or sqrt(n) items for the dynamic one) and merge into it with
+plain writes instead of swaps, which cuts the number of writes roughly
+in half.
+
+Like the algorithms in sort_algorithms, every function here is a
+generator that sorts arr in place and yields its operations.
+"""
+from sort_ops import COMPARE, SWAP, WRITE, HIGHLIGHT, ALLOC
+
+STATIC_BUFFER = 512
+
+
+def _less(x, y, flip):
+    """x < y, or x <= y when flip is set (the stable order of B before A)"""
+    return x <= y if flip else x < y
+
+
+def _swap_ranges(arr, a, b, count):
+    for i in range(count):
+        arr[a + i], arr[b + i] = arr[b + i], arr[a + i]
+        yield (SWAP, a + i, b + i)
+
+
+def _copy(arr, dst, src, count):
+    """Copy count items from src to dst, front to back"""
+    for i in range(count):
+        arr[dst + i] = arr[src + i]
+        yield (WRITE, dst + i, arr[dst + i])
+
+
+def _rotate(arr, start, len1, len2):
+    """Exchange arr[start:start+len1] with the len2 items after it"""
+    while len1 and len2:
+        if len1 <= len2:
+            yield from _swap_ranges(arr, start, start + len1, len1)
+            start += len1
+            len2 -= len1
+        else:
+            yield from _swap_ranges(arr, start + len1 - len2, start + len1, len2)
+            len1 -= len2
+
+
+def _search_left(arr, start, length, key):
+    """Offset of the first item in arr[start:start+length] >= arr[key]"""
+    lo, hi = -1, length
+    while lo < hi - 1:
+        mid = lo + ((hi - lo) >> 1)
+        yield (COMPARE, start + mid, key)
+        if arr[start + mid] >= arr[key]:
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
+def _search_right(arr, start, length, key):
+    """Offset of the first item in arr[start:start+length] > arr[key]"""
+    lo, hi = -1, length
+    while lo < hi - 1:
+        mid = lo + ((hi - lo) >> 1)
+        yield (COMPARE, start + mid, key)
+        if arr[start + mid] > arr[key]:
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
+def _insertion_sort(arr, start, length):
+    for i in range(start + 1, start + length):
+        j = i - 1
+        while j >= start:
+            yield (COMPARE, j + 1, j)
+            if not arr[j + 1] < arr[j]:
+                break
+            arr[j], arr[j + 1] = arr[j + 1], arr[j]
+            yield (SWAP, j, j + 1)
+            j -= 1
+
+
+def _find_keys(arr, start, length, wanted):
+    """Gather up to wanted distinct values, sorted, at the front of the range.
+
+    Returns how many were found.  The keys travel through the array as one
+    sorted group that is rotated forward as the scan goes.
+    """
+    found, first = 1, 0  # The keys are arr[start+first:start+first+found]
+    for i in range(1, length):
+        if found >= wanted:
+            break
+        pos = yield from _search_left(arr, start + first, found, start + i)
+        if pos < found:
+            yield (COMPARE, start + i, start + first + pos)
+        if pos == found or arr[start + i] != arr[start + first + pos]:
+            yield from _rotate(arr, start + first, found, i - (first + found))
+            first = i - found
+            yield from _rotate(arr, start + first + pos, found - pos, 1)
+            found += 1
+    yield from _rotate(arr, start, first, found)
+    return found
+
+
+def _merge_without_buffer(arr, start, len1, len2):
+    """Merge two adjacent runs by binary searches and rotations"""
+    if len1 < len2:
+        while len1:
+            h = yield from _search_left(arr, start + len1, len2, start)
+            if h:
+                yield from _rotate(arr, start, len1, h)
+                start += h
+                len2 -= h
+            if not len2:
+                break
+            while True:
+                start += 1
+                len1 -= 1
+                if not len1:
+                    break
+                yield (COMPARE, start, start + len1)
+                if arr[start] > arr[start + len1]:
+                    break
+    else:
+        while len2:
+            h = yield from _search_right(arr, start, len1, start + len1 + len2 - 1)
+            if h != len1:
+                yield from _rotate(arr, start + h, len1 - h, len2)
+                len1 = h
+            if not len1:
+                break
+            while True:
+                len2 -= 1
+                if not len2:
+                    break
+                yield (COMPARE, start + len1 - 1, start + len1 + len2 - 1)
+                if arr[start + len1 - 1] > arr[start + len1 + len2 - 1]:
+                    break
+
+
+def _merge_left(arr, start, len1, len2, out):
+    """Merge two adjacent runs forward into out, swapping with the buffer there"""
+    left, mid = start, start + len1
+    right, end = mid, mid + len2
+    while right < end:
+        if left < mid:
+            yield (COMPARE, left, right)
+        if left == mid or arr[left] > arr[right]:
+            arr[out], arr[right] = arr[right], arr[out]
+            yield (SWAP, out, right)
+            right += 1
+        else:
+            arr[out], arr[left] = arr[left], arr[out]
+            yield (SWAP, out, left)
+            left += 1
+        out += 1
+    if out != left:
+        yield from _swap_ranges(arr, out, left, mid - left)
+
+
+def _merge_right(arr, start, len1, len2, buffer):
+    """Merge two adjacent runs backward into the buffer items after them"""
+    mid = start + len1
+    out = mid + len2 + buffer - 1
+    right = mid + len2 - 1
+    left = mid - 1
+    while left >= start:
+        if right >= mid:
+            yield (COMPARE, left, right)
+        if right < mid or arr[left] > arr[right]:
+            arr[out], arr[left] = arr[left], arr[out]
+            yield (SWAP, out, left)
+            left -= 1
+        else:
+            arr[out], arr[right] = arr[right], arr[out]
+            yield (SWAP, out, right)
+            right -= 1
+        out -= 1
+    if right != out:
+        while right >= mid:
+            arr[out], arr[right] = arr[right], arr[out]
+            yield (SWAP, out, right)
+            out -= 1
+            right -= 1
+
+
+def _smart_merge(arr, start, len1, origin, len2, buffer):
+    """Merge a leftover run with the next block into the buffer before them.
+
+    origin says which input the leftover came from (0 for A, 1 for B).
+    Returns the length and origin of what is left over from this merge.
+    """
+    out = start - buffer
+    left, left_end = start, start + len1
+    right, right_end = left_end, left_end + len2
+    flip = 1 - origin
+    while left < left_end and right < right_end:
+        yield (COMPARE, left, right)
+        if _less(arr[left], arr[right], flip):
+            arr[out], arr[left] = arr[left], arr[out]
+            yield (SWAP, out, left)
+            left += 1
+        else:
+            arr[out], arr[right] = arr[right], arr[out]
+            yield (SWAP, out, right)
+            right += 1
+        out += 1
+    if left < left_end:
+        rest = left_end - left
+        while left < left_end:
+            left_end -= 1
+            right_end -= 1
+            arr[left_end], arr[right_end] = arr[right_end], arr[left_end]
+            yield (SWAP, left_end, right_end)
+        return rest, origin
+    return right_end - right, flip
+
+
+def _smart_merge_without_buffer(arr, start, len1, origin, len2):
+    """_smart_merge by rotations, for when there is no buffer"""
+    if not len2:
+        return len1, origin
+    flip = 1 - origin
+    if len1:
+        yield (COMPARE, start + len1 - 1, start + len1)
+    if len1 and not _less(arr[start + len1 - 1], arr[start + len1], flip):
+        while len1:
+            if flip:
+                h = yield from _search_left(arr, start + len1, len2, start)
+            else:
+                h = yield from _search_right(arr, start + len1, len2, start)
+            if h:
+                yield from _rotate(arr, start, len1, h)
+                start += h
+                len2 -= h
+            if not len2:
+                return len1, origin
+            while True:
+                start += 1
+                len1 -= 1
+                if not len1:
+                    break
+                yield (COMPARE, start, start + len1)
+                if not _less(arr[start], arr[start + len1], flip):
+                    break
+    return len2, flip
+
+
+def _merge_left_external(arr, start, len1, len2, out):
+    """_merge_left for when the buffer's contents are saved elsewhere"""
+    left, mid = start, start + len1
+    right, end = mid, mid + len2
+    while right < end:
+        if left < mid:
+            yield (COMPARE, left, right)
+        if left == mid or arr[left] > arr[right]:
+            arr[out] = arr[right]
+            right += 1
+        else:
+            arr[out] = arr[left]
+            left += 1
+        yield (WRITE, out, arr[out])
+        out += 1
+    if out != left:
+        yield from _copy(arr, out, left, mid - left)
+
+
+def _smart_merge_external(arr, start, len1, origin, len2, buffer):
+    """_smart_merge for when the buffer's contents are saved elsewhere"""
+    out = start - buffer
+    left, left_end = start, start + len1
+    right, right_end = left_end, left_end + len2
+    flip = 1 - origin
+    while left < left_end and right < right_end:
+        yield (COMPARE, left, right)
+        if _less(arr[left], arr[right], flip):
+            arr[out] = arr[left]
+            left += 1
+        else:
+            arr[out] = arr[right]
+            right += 1
+        yield (WRITE, out, arr[out])
+        out += 1
+    if left < left_end:
+        rest = left_end - left
+        while left < left_end:
+            left_end -= 1
+            right_end -= 1
+            arr[right_end] = arr[left_end]
+            yield (WRITE, right_end, arr[right_end])
+        return rest, origin
+    return right_end - right, flip
+
+
+def _block_origin(arr, key, midkey):
+    """0 if the block tagged by key came from run A, 1 if from run B"""
+    yield (COMPARE, key, midkey)
+    return 0 if arr[key] < arr[midkey] else 1
+
+
+def _merge_blocks(arr, keys, midkey, start, nblock, lblock, has_buffer, nblock2, llast):
+    """Merge the selection-sorted blocks of a pair of runs, left to right.
+
+    The first nblock blocks are tagged by arr[keys:keys+nblock]; a tag
+    below arr[midkey] marks a block of run A.  They are followed by nblock2
+    A blocks and finally a short B block of llast items, which belongs
+    before them.  With a buffer, the lblock items before start are the
+    buffer and the merged result ends up lblock places further left.
+    """
+    if nblock == 0:
+        length = nblock2 * lblock
+        if has_buffer:
+            yield from _merge_left(arr, start, length, llast, start - lblock)
+        else:
+            yield from _merge_without_buffer(arr, start, length, llast)
+        return
+
+    rest_len = lblock
+    rest_origin = yield from _block_origin(arr, keys, midkey)
+    position = lblock
+    for block in range(1, nblock):
+        rest = position - rest_len
+        origin = yield from _block_origin(arr, keys + block, midkey)
+        if origin == rest_origin:
+            if has_buffer:
+                yield from _swap_ranges(arr, start + rest - lblock, start + rest, rest_len)
+            rest_len = lblock
+        elif has_buffer:
+            rest_len, rest_origin = yield from _smart_merge(
+                arr, start + rest, rest_len, rest_origin, lblock, lblock)
+        else:
+            rest_len, rest_origin = yield from _smart_merge_without_buffer(
+                arr, start + rest, rest_len, rest_origin, lblock)
+        position += lblock
+
+    rest = position - rest_len
+    if llast:
+        if rest_origin:
+            if has_buffer:
+                yield from _swap_ranges(arr, start + rest - lblock, start + rest, rest_len)
+            rest = position
+            rest_len = lblock * nblock2
+        else:
+            rest_len += lblock * nblock2
+        if has_buffer:
+            yield from _merge_left(arr, start + rest, rest_len, llast, start + rest - lblock)
+        else:
+            yield from _merge_without_buffer(arr, start + rest, rest_len, llast)
+    elif has_buffer:
+        yield from _swap_ranges(arr, start + rest, start + rest - lblock, rest_len)
+
+
+def _merge_blocks_external(arr, keys, midkey, start, nblock, lblock, nblock2, llast):
+    """_merge_blocks when the buffer's contents are saved elsewhere"""
+    if nblock == 0:
+        yield from _merge_left_external(arr, start, nblock2 * lblock, llast, start - lblock)
+        return
+
+    rest_len = lblock
+    rest_origin = yield from _block_origin(arr, keys, midkey)
+    position = lblock
+    for block in range(1, nblock):
+        rest = position - rest_len
+        origin = yield from _block_origin(arr, keys + block, midkey)
+        if origin == rest_origin:
+            yield from _copy(arr, start + rest - lblock, start + rest, rest_len)
+            rest_len = lblock
+        else:
+            rest_len, rest_origin = yield from _smart_merge_external(
+                arr, start + rest, rest_len, rest_origin, lblock, lblock)
+        position += lblock
+
+    rest = position - rest_len
+    if llast:
+        if rest_origin:
+            yield from _copy(arr, start + rest - lblock, start + rest, rest_len)
+            rest = position
+            rest_len = lblock * nblock2
+        else:
+            rest_len += lblock * nblock2
+        yield from _merge_left_external(arr, start + rest, rest_len, llast, start + rest - lblock)
+    else:
+        yield from _copy(arr, start + rest - lblock, start + rest, rest_len)
+
+
+def _build_blocks(arr, start, length, k, external):
+    """Sort arr[start:start+length] into runs of 2*k items.
+
+    The k items before start are the buffer; afterwards they sit at the
+    front of the range, followed by the runs.  As much of the buffer as
+    the external list holds is built with writes rather than swaps.
+    """
+    kbuf = min(k, len(external) if external else 0)
+    while kbuf & (kbuf - 1):
+        kbuf &= kbuf - 1  # Largest power of two that fits
+    if kbuf:
+        for i in range(kbuf):
+            external[i] = arr[start - kbuf + i]
+        for m in range(1, length, 2):
+            yield (COMPARE, start + m - 1, start + m)
+            u = 1 if arr[start + m - 1] > arr[start + m] else 0
+            arr[start + m - 3] = arr[start + m - 1 + u]
+            yield (WRITE, start + m - 3, arr[start + m - 3])
+            arr[start + m - 2] = arr[start + m - u]
+            yield (WRITE, start + m - 2, arr[start + m - 2])
+        if length % 2:
+            arr[start + length - 3] = arr[start + length - 1]
+            yield (WRITE, start + length - 3, arr[start + length - 3])
+        start -= 2
+        h = 2
+        while h < kbuf:
+            p = 0
+            while p <= length - 2 * h:
+                yield from _merge_left_external(arr, start + p, h, h, start + p - h)
+                p += 2 * h
+            rest = length - p
+            if rest > h:
+                yield from _merge_left_external(arr, start + p, h, rest - h, start + p - h)
+            else:
+                yield from _copy(arr, start + p - h, start + p, rest)
+            start -= h
+            h *= 2
+        # The buffer goes back behind the runs
+        for i in range(kbuf):
+            arr[start + length + i] = external[i]
+            yield (WRITE, start + length + i, external[i])
+    else:
+        for m in range(1, length, 2):
+            yield (COMPARE, start + m - 1, start + m)
+            u = 1 if arr[start + m - 1] > arr[start + m] else 0
+            arr[start + m - 3], arr[start + m - 1 + u] = arr[start + m - 1 + u], arr[start + m - 3]
+            yield (SWAP, start + m - 3, start + m - 1 + u)
+            arr[start + m - 2], arr[start + m - u] = arr[start + m - u], arr[start + m - 2]
+            yield (SWAP, start + m - 2, start + m - u)
+        if length % 2:
+            arr[start + length - 1], arr[start + length - 3] = arr[start + length - 3], arr[start + length - 1]
+            yield (SWAP, start + length - 1, start + length - 3)
+        start -= 2
+        h = 2
+
+    while h < k:
+        p = 0
+        while p <= length - 2 * h:
+            yield from _merge_left(arr, start + p, h, h, start + p - h)
+            p += 2 * h
+        rest = length - p
+        if rest > h:
+            yield from _merge_left(arr, start + p, h, rest - h, start + p - h)
+        else:
+            yield from _rotate(arr, start + p - h, h, rest)
+        start -= h
+        h *= 2
+
+    # Runs of 2*k, merged backward so the buffer ends up in front of them
+    rest = length % (2 * k)
+    p = length - rest
+    if rest <= k:
+        yield from _rotate(arr, start + p, rest, k)
+    else:
+        yield from _merge_right(arr, start + p, k, rest - k, k)
+    while p > 0:
+        p -= 2 * k
+        yield from _merge_right(arr, start + p, k, k, k)
+
+
+def _combine_blocks(arr, keys, start, length, run, lblock, has_buffer, external):
+    """Merge pairs of sorted runs of arr[start:start+length], run items each"""
+    pairs = length // (2 * run)
+    leftover = length % (2 * run)
+    if leftover <= run:
+        length -= leftover  # A lone run at the end is already sorted
+        leftover = 0
+    if external:
+        for i in range(lblock):
+            external[i] = arr[start - lblock + i]
+
+    for pair in range(pairs + 1):
+        if pair == pairs and not leftover:
+            break
+        first = start + pair * 2 * run
+        nblock = (leftover if pair == pairs else 2 * run) // lblock
+        yield (HIGHLIGHT, first, first + (leftover if pair == pairs else 2 * run))
+        yield from _insertion_sort(arr, keys, nblock + (1 if pair == pairs else 0))
+
+        # Selection-sort the blocks by their first item (ties by tag),
+        # moving the tags along and tracking where the first B tag went
+        midkey = run // lblock
+        for u in range(1, nblock):
+            smallest = u - 1
+            for v in range(u, nblock):
+                a, b = first + smallest * lblock, first + v * lblock
+                yield (COMPARE, a, b)
+                if arr[a] > arr[b]:
+                    smallest = v
+                elif arr[a] == arr[b]:
+                    yield (COMPARE, keys + smallest, keys + v)
+                    if arr[keys + smallest] > arr[keys + v]:
+                        smallest = v
+            if smallest != u - 1:
+                yield from _swap_ranges(arr, first + (u - 1) * lblock, first + smallest * lblock, lblock)
+                a, b = keys + u - 1, keys + smallest
+                arr[a], arr[b] = arr[b], arr[a]
+                yield (SWAP, a, b)
+                if midkey == u - 1 or midkey == smallest:
+                    midkey ^= (u - 1) ^ smallest
+
+        # A short last block of B goes before the trailing A blocks it is below
+        nblock2 = llast = 0
+        if pair == pairs:
+            llast = leftover % lblock
+        if llast:
+            while nblock2 < nblock:
+                a, b = first + nblock * lblock, first + (nblock - nblock2 - 1) * lblock
+                yield (COMPARE, a, b)
+                if not arr[a] < arr[b]:
+                    break
+                nblock2 += 1
+
+        if external:
+            yield from _merge_blocks_external(arr, keys, keys + midkey, first, nblock - nblock2,
+                                              lblock, nblock2, llast)
+        else:
+            yield from _merge_blocks(arr, keys, keys + midkey, first, nblock - nblock2,
+                                     lblock, has_buffer, nblock2, llast)
+
+    # Move the buffer from behind the merged runs back in front of them
+    if external:
+        for p in range(start + length - 1, start - 1, -1):
+            arr[p] = arr[p - lblock]
+            yield (WRITE, p, arr[p])
+        for i in range(lblock):
+            arr[start - lblock + i] = external[i]
+            yield (WRITE, start - lblock + i, external[i])
+    elif has_buffer:
+        for p in range(start + length - 1, start - 1, -1):
+            arr[p], arr[p - lblock] = arr[p - lblock], arr[p]
+            yield (SWAP, p, p - lblock)
+
+
+def _lazy_stable_sort(arr, start, length):
+    """Bottom-up merge sort by rotations, for inputs with under 4 distinct values"""
+    for m in range(start + 1, start + length, 2):
+        yield (COMPARE, m - 1, m)
+        if arr[m - 1] > arr[m]:
+            arr[m - 1], arr[m] = arr[m], arr[m - 1]
+            yield (SWAP, m - 1, m)
+    h = 2
+    while h < length:
+        p = 0
+        while p <= length - 2 * h:
+            yield from _merge_without_buffer(arr, start + p, h, h)
+            p += 2 * h
+        rest = length - p
+        if rest > h:
+            yield from _merge_without_buffer(arr, start + p, h, rest - h)
+        h *= 2
+
+
+def _grail_sort(arr, external=None):
+    n = len(arr)
+    if n < 16:
+        yield from _insertion_sort(arr, 0, n)
+        return
+
+    lblock = 1
+    while lblock * lblock < n:
+        lblock *= 2
+    nkeys = (n - 1) // lblock + 1
+    found = yield from _find_keys(arr, 0, n, nkeys + lblock)
+    has_buffer = True
+    if found < nkeys + lblock:
+        if found < 4:
+            yield from _lazy_stable_sort(arr, 0, n)
+            return
+        # Too few distinct values for a buffer: use all keys as tags
+        nkeys = lblock
+        while nkeys > found:
+            nkeys //= 2
+        has_buffer = False
+        lblock = 0
+
+    ptr = lblock + nkeys  # Keys, then the buffer, then the data
+    run = lblock if has_buffer else nkeys
+    yield from _build_blocks(arr, ptr, n - ptr, run, external if has_buffer else None)
+
+    # Runs of 2*run are sorted; keep merging them in pairs
+    run *= 2
+    while n - ptr > run:
+        block, block_buffer = lblock, has_buffer
+        if not has_buffer:
+            if nkeys > 4 and nkeys // 8 * nkeys >= run:
+                # Enough keys to spare half of them as a buffer
+                block, block_buffer = nkeys // 2, True
+            else:
+                tags, budget = 1, run * found // 2
+                while tags < nkeys and budget:
+                    tags *= 2
+                    budget //= 8
+                block = 2 * run // tags
+        use_external = block_buffer and external is not None and block <= len(external)
+        yield from _combine_blocks(arr, 0, ptr, n - ptr, run, block, block_buffer,
+                                   external if use_external else None)
+        run *= 2
+
+    # Finally put the keys and buffer back among the data
+    yield from _insertion_sort(arr, 0, ptr)
+    yield from _merge_without_buffer(arr, 0, ptr, n - ptr)
+
+
+def grail_sort(arr):
+    """GrailSort with O(1) extra memory"""
+    yield from _grail_sort(arr)
+
+
+def grail_sort_static_buffer(arr, size=STATIC_BUFFER):
+    """GrailSort with a fixed external buffer of size items"""
+    yield (ALLOC, size, 0)
+    yield from _grail_sort(arr, [None] * size)
+
+
+def grail_sort_dynamic_buffer(arr):
+    """GrailSort with an external buffer of about sqrt(n) items"""
+    size = 1
+    while size * size < len(arr):
+        size *= 2
+    yield (ALLOC, size, 0)
+    yield from _grail_sort(arr, [None] * size)
@@ -0,0 +1,43 @@
+from functools import lru_cache
+
+import pygame
+
+WHITE = (255, 255, 255)
+
+
+@lru_cache(maxsize=None)
+def get_font(size):
+    """Fonts are expensive to create, so each size is only loaded once"""
+    return pygame.font.SysFont(None, size)
+
+
+class Label:
+    """A line of text that is only re-rendered when its values change"""
+
+    def __init__(self, template, pos, size=30, color=WHITE):
+        self.template = template
+        self.pos = pos
+        self.font = get_font(size)
+        self.color = color
+        self.values = None
+        self.surface = None
+
+    def draw(self, surface, *values):
+        if values != self.values or self.surface is None:
+            self.values = values
+            self.surface = self.font.render(self.template.format(*values), True, self.color)
+        surface.blit(self.surface, self.pos)
+
+
+class TextPanel:
+    """Columns of static text rendered once into a cached surface"""
+
+    def __init__(self, columns, size, font_size=24, line_height=20, color=WHITE):
+        font = get_font(font_size)
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        for x, lines in columns:
+            for row, line in enumerate(lines):
+                self.surface.blit(font.render(line, True, color), (x, row * line_height))
+
+    def draw(self, surface, pos):
+        surface.blit(self.surface, pos)
@@ -0,0 +1,90 @@
+"""Operation counters for the sorting algorithms.
+
+Reads and writes are counted where they happen, by wrapping the array in
+an InstrumentedArray.  Comparisons, swaps and auxiliary buffer allocations
+are counted from the operation stream the algorithm yields.  With counters
+switched off, ``instrument()`` hands back the plain array, so timed runs
+pay nothing for the counting machinery.
+"""
+from sort_ops import COMPARE, SWAP, ALLOC
+
+FIELDS = ("reads", "writes", "compares", "swaps", "aux_allocations", "aux_slots")
+
+
+class Counters:
+    __slots__ = FIELDS
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        for field in FIELDS:
+            setattr(self, field, 0)
+
+    def count(self, op):
+        """Account for one operation from an algorithm's stream"""
+        code = op[0]
+        if code == COMPARE:
+            self.compares += 1
+        elif code == SWAP:
+            self.swaps += 1
+        elif code == ALLOC:
+            self.aux_allocations += 1
+            self.aux_slots += op[1]
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in FIELDS}
+
+
+class InstrumentedArray:
+    """A sequence that counts every element read and write of its backing"""
+
+    __slots__ = ("data", "counters")
+
+    def __init__(self, data, counters):
+        self.data = data
+        self.counters = counters
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        value = self.data[index]
+        self.counters.reads += len(value) if isinstance(index, slice) else 1
+        return value
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self.counters.writes += len(range(*index.indices(len(self.data))))
+        else:
+            self.counters.writes += 1
+        self.data[index] = value
+
+    def __iter__(self):
+        counters = self.counters
+        for value in self.data:
+            counters.reads += 1
+            yield value
+
+
+def instrument(arr, counters=None):
+    """arr wrapped for counting, or arr itself when counters is None"""
+    if counters is None:
+        return arr
+    return InstrumentedArray(arr, counters)
+
+
+def counted(operations, counters):
+    """Pass an operation stream through, counting it on the way"""
+    count = counters.count
+    for op in operations:
+        count(op)
+        yield op
+
+
+def measure(algorithm, arr):
+    """Sort arr with full instrumentation and return the Counters"""
+    counters = Counters()
+    for _ in counted(algorithm(instrument(arr, counters)), counters):
+        pass
+    return counters
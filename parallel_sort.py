@@ -0,0 +1,156 @@
+"""Parallel merge sort of a NumPy array on a process pool.
+
+The values live in a ``multiprocessing.shared_memory`` block with room for
+two copies of the array, so the pool's processes read and write them in
+place and only small (offset, length) tasks cross process boundaries.
+
+    1. The array is cut into chunks and every chunk is sorted by a worker.
+    2. Neighbouring runs are merged pairwise, ping-ponging between the two
+       copies.  Each merge is split with merge-path co-ranking into pieces
+       of about chunk_size outputs, so even the last merge of two halves
+       keeps every worker busy.
+
+The sort is stable.  From the command line it times itself against a
+single np.sort, e.g.
+
+    python parallel_sort.py --size 1e7 --workers 8
+"""
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+import workloads
+
+MIN_CHUNK = 1 << 16  # Smaller tasks cost more in scheduling than they save
+
+
+def _in_shared(task, shm_name, dtype, n, *args):
+    """Run task(halves, *args) on the two n-element halves of a shared block"""
+    shm = SharedMemory(name=shm_name)
+    halves = np.ndarray((2, n), dtype=dtype, buffer=shm.buf)
+    try:
+        task(halves, *args)
+    finally:
+        del halves  # No views may outlive the block's mapping
+        shm.close()
+
+
+def _sort_chunk(halves, lo, hi):
+    halves[0, lo:hi].sort(kind="stable")
+
+
+def co_rank(k, a, b):
+    """Split the first k outputs of a stable merge of a and b.
+
+    Returns (i, j), i + j == k, such that a[:i] and b[:j] are exactly the
+    first k items of the merge (ties taken from a first).  Binary search,
+    O(log min(len(a), len(b))).
+    """
+    lo, hi = max(0, k - len(b)), min(k, len(a))
+    while lo < hi:
+        i = (lo + hi) // 2
+        if a[i] <= b[k - i - 1]:
+            lo = i + 1
+        else:
+            hi = i
+    return lo, k - lo
+
+
+def _merge_piece(halves, src, lo, mid, hi, start, stop):
+    """Write outputs start..stop of merging src[lo:mid] and src[mid:hi]"""
+    a, b = halves[src, lo:mid], halves[src, mid:hi]
+    i0, j0 = co_rank(start, a, b)
+    i1, j1 = co_rank(stop, a, b)
+    out = halves[1 - src, lo + start:lo + stop]
+    out[:i1 - i0] = a[i0:i1]
+    out[i1 - i0:] = b[j0:j1]
+    # Two sorted runs, which NumPy's stable sort merges in linear time
+    out.sort(kind="stable")
+
+
+def parallel_merge_sort(values, workers=None, chunk_size=None):
+    """Sorted copy of values (a 1-D NumPy array or sequence of numbers).
+
+    workers defaults to the CPU count; chunk_size is the number of
+    elements per task and defaults to an even share per worker, but never
+    less than MIN_CHUNK.
+    """
+    values = np.asarray(values)
+    n = len(values)
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(MIN_CHUNK, -(-n // workers))
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if workers == 1 or n <= chunk_size:
+        return np.sort(values, kind="stable")
+
+    shm = SharedMemory(create=True, size=2 * n * values.dtype.itemsize)
+    halves = np.ndarray((2, n), dtype=values.dtype, buffer=shm.buf)
+    try:
+        halves[0] = values
+        dtype = values.dtype.str
+        bounds = list(range(0, n, chunk_size)) + [n]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            tasks = [pool.submit(_in_shared, _sort_chunk, shm.name, dtype, n, lo, hi)
+                     for lo, hi in zip(bounds, bounds[1:])]
+            for task in tasks:
+                task.result()
+
+            src = 0
+            while len(bounds) > 2:
+                tasks = []
+                merged = bounds[::2]
+                for lo, mid, hi in zip(bounds[::2], bounds[1::2], bounds[2::2]):
+                    pieces = math.ceil((hi - lo) / chunk_size)
+                    cuts = [(hi - lo) * p // pieces for p in range(pieces + 1)]
+                    tasks += [pool.submit(_in_shared, _merge_piece, shm.name, dtype, n, src,
+                                          lo, mid, hi, start, stop)
+                              for start, stop in zip(cuts, cuts[1:])]
+                if len(bounds) % 2 == 0:
+                    # Odd number of runs: the last one is carried over as is
+                    halves[1 - src, bounds[-2]:] = halves[src, bounds[-2]:]
+                    merged.append(n)
+                for task in tasks:
+                    task.result()
+                bounds = merged
+                src = 1 - src
+        return halves[src].copy()
+    finally:
+        del halves
+        shm.close()
+        shm.unlink()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Time the parallel merge sort against np.sort")
+    parser.add_argument("--size", type=lambda s: int(float(s)), default=10_000_000,
+                        help="array size (1e7 style allowed)")
+    parser.add_argument("--distribution", default="random", choices=list(workloads.DISTRIBUTIONS))
+    parser.add_argument("--workers", type=int, help="processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, help="elements per task")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    values = workloads.generate(args.distribution, args.size, args.seed)
+    start = time.perf_counter()
+    expected = np.sort(values, kind="stable")
+    single = time.perf_counter() - start
+    start = time.perf_counter()
+    result = parallel_merge_sort(values, args.workers, args.chunk_size)
+    parallel = time.perf_counter() - start
+    assert np.array_equal(result, expected)
+    print(f"np.sort {single:.3f} s   parallel {parallel:.3f} s   "
+          f"speedup {single / parallel:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
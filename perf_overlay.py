@@ -0,0 +1,149 @@
+"""Frame-by-frame performance numbers for the pygame visualizer.
+
+FrameStats keeps a rolling window of frames, each with its total time,
+the number of sort operations it ran and the time spent in each drawing
+section.  PerfOverlay paints a summary and a frame-time histogram over the
+bars; MetricsLog appends the same summary to a file as JSON lines.
+"""
+import json
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pygame
+
+from hud import get_font
+
+# Where each frame's time goes: stepping the sort, measuring presortedness,
+# the HUD text, the bars (including pushing them to the display) and the
+# pygame_gui widgets
+SECTIONS = ("algorithm", "metrics", "hud", "bars", "gui")
+
+HISTOGRAM_MAX_MS = 50  # Frames slower than this land in the last bin
+TARGET_COLOR = (255, 200, 0)
+PANEL_COLOR = (25, 25, 25)
+TEXT_COLOR = (220, 220, 220)
+BIN_COLOR = (90, 170, 255)
+
+
+def _percentile(ordered, fraction):
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class FrameStats:
+    def __init__(self, window=240):
+        self.frames = deque(maxlen=window)  # (frame_ns, ops, section_ns)
+        self.current = dict.fromkeys(SECTIONS, 0)
+        self.ops = 0  # Operations run in the current frame
+        self.last_frame = None
+
+    @contextmanager
+    def section(self, name):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.current[name] += time.perf_counter_ns() - start
+
+    def end_frame(self):
+        now = time.perf_counter_ns()
+        if self.last_frame is not None:
+            self.frames.append((now - self.last_frame, self.ops, self.current))
+        self.last_frame = now
+        self.current = dict.fromkeys(SECTIONS, 0)
+        self.ops = 0
+
+    def frame_times_ms(self):
+        return [frame_ns / 1e6 for frame_ns, _, _ in self.frames]
+
+    def snapshot(self):
+        """Summary of the frames in the window"""
+        if not self.frames:
+            return None
+        total_ns = sum(frame_ns for frame_ns, _, _ in self.frames)
+        ordered = sorted(self.frame_times_ms())
+        summary = {
+            "frames": len(self.frames),
+            "fps": len(self.frames) * 1e9 / total_ns,
+            "ops_per_s": sum(ops for _, ops, _ in self.frames) * 1e9 / total_ns,
+            "p50_ms": _percentile(ordered, 0.50),
+            "p99_ms": _percentile(ordered, 0.99),
+        }
+        for name in SECTIONS:
+            section_ns = sum(sections[name] for _, _, sections in self.frames)
+            summary[name + "_ms"] = section_ns / len(self.frames) / 1e6
+        return summary
+
+
+class PerfOverlay:
+    """A panel of frame statistics, re-rendered a few times a second"""
+
+    def __init__(self, rect, refresh=0.25, target_fps=60):
+        self.rect = pygame.Rect(rect)
+        self.refresh = refresh
+        self.target_ms = 1000 / target_fps
+        self.font = get_font(20)
+        self.surface = None
+        self.last_render = 0.0
+
+    def draw(self, surface, stats):
+        now = time.perf_counter()
+        if self.surface is None or now - self.last_render >= self.refresh:
+            self.surface = self.render(stats)
+            self.last_render = now
+        surface.blit(self.surface, self.rect)
+        return self.rect
+
+    def render(self, stats):
+        panel = pygame.Surface(self.rect.size)
+        panel.fill(PANEL_COLOR)
+        summary = stats.snapshot()
+        if summary is None:
+            return panel
+        lines = [
+            f"{summary['fps']:5.1f} fps   {summary['ops_per_s']:,.0f} ops/s",
+            f"frame p50 {summary['p50_ms']:.1f} ms   p99 {summary['p99_ms']:.1f} ms",
+            f"algorithm {summary['algorithm_ms']:.2f}   metrics {summary['metrics_ms']:.2f} ms",
+            f"hud {summary['hud_ms']:.2f}   bars {summary['bars_ms']:.2f}   gui {summary['gui_ms']:.2f} ms",
+        ]
+        for row, line in enumerate(lines):
+            panel.blit(self.font.render(line, True, TEXT_COLOR), (6, 4 + row * 18))
+        self._draw_histogram(panel, stats.frame_times_ms(), 4 + len(lines) * 18 + 4)
+        return panel
+
+    def _draw_histogram(self, panel, times_ms, top):
+        """One bin per 2 pixels, 0..HISTOGRAM_MAX_MS ms left to right"""
+        area = pygame.Rect(6, top, self.rect.width - 12, self.rect.height - top - 4)
+        bins = [0] * (area.width // 2)
+        for ms in times_ms:
+            bins[min(int(ms / HISTOGRAM_MAX_MS * len(bins)), len(bins) - 1)] += 1
+        tallest = max(bins) or 1
+        for i, count in enumerate(bins):
+            height = count * area.height // tallest
+            panel.fill(BIN_COLOR, (area.x + 2 * i, area.bottom - height, 2, height))
+        # Marker at the frame budget
+        x = area.x + int(self.target_ms / HISTOGRAM_MAX_MS * area.width)
+        panel.fill(TARGET_COLOR, (x, area.y, 1, area.height))
+
+
+class MetricsLog:
+    """Appends a FrameStats summary to a file as a JSON line every interval"""
+
+    def __init__(self, path, interval=1.0):
+        self.file = open(path, "a")
+        self.interval = interval
+        self.next_write = time.perf_counter() + interval
+
+    def update(self, stats, **fields):
+        now = time.perf_counter()
+        if now < self.next_write:
+            return
+        self.next_write = now + self.interval
+        summary = stats.snapshot()
+        if summary is not None:
+            self.file.write(json.dumps({"time": time.time(), **fields, **summary}) + "\n")
+            self.file.flush()
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,156 @@
+"""How far from sorted an input is, in O(n log n).
+
+The measures of presortedness from the adaptive sorting literature, each
+counted with NumPy over a whole array:
+
+    inversions        pairs i < j with x[i] > x[j] (Inv)
+    runs              maximal non-decreasing runs (Runs)
+    lis               longest non-decreasing subsequence
+    rem               items to remove to leave it sorted, n - lis (Rem)
+    max_displacement  furthest any item is from its sorted position (Max)
+    oscillation       how often the adjacent pairs straddle items (Osc)
+
+All are 0 (runs and lis: 1 and n) for sorted input.  ``measure()`` takes
+them all at once and ``suggest_algorithm()`` turns them into a first
+guess at the fastest algorithm in sort_algorithms.  From the command
+line it reports every workload distribution, or a file of numbers:
+
+    python presortedness.py --size 100000
+    python presortedness.py latencies.txt
+"""
+import argparse
+import json
+import sys
+from bisect import bisect_right
+
+import numpy as np
+
+import workloads
+
+
+def inversions(values):
+    """Inversion count by binary radix partitioning of the ranks.
+
+    Going from the top bit of the ranks down, the items are kept grouped
+    by the bits above the current one, each group in original order.  Two
+    items first differ at the current bit exactly when they share a
+    group, so every 0-bit item is inverted with each 1-bit item before it
+    in its group: one cumulative sum.  A stable partition of every group
+    by the bit then sets up the next one.  O(n) per bit, log n bits.
+    """
+    seq = np.unique(values, return_inverse=True)[1].reshape(-1).astype(np.int64)
+    n = len(seq)
+    index = np.arange(n)
+    count = 0
+    for bit_number in reversed(range(max(n - 1, 0).bit_length())):
+        key = seq >> bit_number  # The group and, in the low bit, the bit
+        bit = key & 1
+        starts = np.concatenate(([0], np.cumsum(np.bincount(key))))
+        ones = np.concatenate(([0], np.cumsum(bit)))
+        ones_before = ones[:-1] - ones[starts[key - bit]]  # In the same group
+        count += int(ones_before[bit == 0].sum())
+        position = np.where(bit == 1, starts[key] + ones_before, index - ones_before)
+        partitioned = np.empty_like(seq)
+        partitioned[position] = seq
+        seq = partitioned
+    return count
+
+
+def runs(values):
+    values = np.asarray(values)
+    if len(values) == 0:
+        return 0
+    return 1 + int(np.count_nonzero(values[1:] < values[:-1]))
+
+
+def lis(values):
+    """Length of the longest non-decreasing subsequence (patience sorting)"""
+    tails = []  # tails[k]: smallest tail of a subsequence of length k + 1
+    for value in np.asarray(values).tolist():
+        k = bisect_right(tails, value)
+        if k == len(tails):
+            tails.append(value)
+        else:
+            tails[k] = value
+    return len(tails)
+
+
+def rem(values):
+    return len(values) - lis(values)
+
+
+def max_displacement(values):
+    """Largest distance between an item's position and its stable sorted one"""
+    if len(values) == 0:
+        return 0
+    order = np.argsort(values, kind="stable")
+    return int(np.abs(order - np.arange(len(order))).max())
+
+
+def oscillation(values):
+    """Osc: over all adjacent pairs, the items strictly between the two"""
+    values = np.asarray(values)
+    ordered = np.sort(values)
+    lo = np.minimum(values[:-1], values[1:])
+    hi = np.maximum(values[:-1], values[1:])
+    between = np.searchsorted(ordered, hi) - np.searchsorted(ordered, lo, side="right")
+    return int(np.clip(between, 0, None).sum())
+
+
+def measure(values):
+    """Every measure of values, plus n and inversions as a share of the maximum"""
+    values = np.asarray(values)
+    n = len(values)
+    metrics = {"n": n}
+    metrics["inversions"] = inversions(values)
+    metrics["inversion_ratio"] = metrics["inversions"] / (n * (n - 1) // 2) if n > 1 else 0.0
+    metrics["runs"] = runs(values)
+    metrics["lis"] = lis(values)
+    metrics["rem"] = n - metrics["lis"]
+    metrics["max_displacement"] = max_displacement(values)
+    metrics["oscillation"] = oscillation(values)
+    return metrics
+
+
+def suggest_algorithm(metrics):
+    """A first guess at the fastest sort for input with these metrics.
+
+    Insertion sort costs O(n + Inv) and Timsort O(n log Runs); anything
+    else gets introsort.  benchmark.py gives the real answer.
+    """
+    n = metrics["n"]
+    if metrics["inversions"] <= n:
+        return "Insertion Sort"
+    if metrics["runs"] <= max(2, n.bit_length()):
+        return "Tim Sort"
+    return "Quick Sort"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure how presorted inputs are")
+    parser.add_argument("input", nargs="?",
+                        help="file with one number per line (default: the workload distributions)")
+    parser.add_argument("--size", type=lambda s: int(float(s)), default=10_000,
+                        help="distribution size (1e5 style allowed)")
+    parser.add_argument("--distributions", nargs="+", default=list(workloads.DISTRIBUTIONS),
+                        choices=list(workloads.DISTRIBUTIONS))
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.input:
+        inputs = {args.input: np.loadtxt(args.input, ndmin=1)}
+    else:
+        inputs = {name: workloads.generate(name, args.size, args.seed)
+                  for name in args.distributions}
+    for name, values in inputs.items():
+        metrics = measure(values)
+        metrics["suggested"] = suggest_algorithm(metrics)
+        json.dump({"input": name, **metrics}, sys.stdout)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
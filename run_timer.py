@@ -0,0 +1,69 @@
+"""Where the time of a visualized sort goes.
+
+The wall time of a run is split into buckets, each measured with
+perf_counter_ns around the code that spends it:
+
+    algorithm - stepping the sort's generator (and counting its operations)
+    render    - drawing bars, HUD and GUI
+    delay     - deliberate waiting: frame rate caps, gaps between ticks
+    events    - handling input and updating the GUI
+    metrics   - measuring the presortedness shown in the HUD
+
+Whatever falls between the measured sections is reported as "other", so
+the buckets always add up to the wall time.
+"""
+import time
+from contextlib import contextmanager
+
+BUCKETS = ("algorithm", "render", "delay", "events", "metrics")
+
+
+class RunTimer:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.ns = dict.fromkeys(BUCKETS, 0)
+        self.started = None
+        self.stopped = None
+
+    @property
+    def running(self):
+        return self.started is not None and self.stopped is None
+
+    def start(self):
+        self.reset()
+        self.started = time.perf_counter_ns()
+
+    def stop(self):
+        """Stop the clock and return the breakdown"""
+        if self.running:
+            self.stopped = time.perf_counter_ns()
+        return self.breakdown()
+
+    def add(self, bucket, ns):
+        if self.running:
+            self.ns[bucket] += ns
+
+    @contextmanager
+    def section(self, bucket):
+        """Charge the time spent in a with block to bucket"""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(bucket, time.perf_counter_ns() - start)
+
+    def wall_ns(self):
+        if self.started is None:
+            return 0
+        end = self.stopped if self.stopped is not None else time.perf_counter_ns()
+        return end - self.started
+
+    def breakdown(self):
+        """Seconds per bucket, plus "other" and the "wall" total"""
+        wall = self.wall_ns()
+        result = {bucket: ns / 1e9 for bucket, ns in self.ns.items()}
+        result["other"] = max(0, wall - sum(self.ns.values())) / 1e9
+        result["wall"] = wall / 1e9
+        return result
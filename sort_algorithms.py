@@ -0,0 +1,951 @@
+"""Front-end agnostic sorting algorithms.
+
+Every algorithm is a generator that sorts ``arr`` in place and yields the
+operations it performs (see sort_ops).  Front ends consume the stream to
+animate it; headless callers can simply drain it with ``sort_ops.run``.
+"""
+import random
+from functools import partial
+
+import numpy as np
+
+from grailsort import grail_sort, grail_sort_static_buffer, grail_sort_dynamic_buffer
+from sort_ops import COMPARE, SWAP, WRITE, HIGHLIGHT, ALLOC
+from sorting_networks import odd_even_merge_sort, bitonic_sort
+from timsort import tim_sort
+
+
+def bubble_sort(arr):
+    n = len(arr)
+    for i in range(n):
+        for j in range(0, n - i - 1):
+            yield (COMPARE, j, j + 1)
+            if arr[j] > arr[j + 1]:
+                arr[j], arr[j + 1] = arr[j + 1], arr[j]
+                yield (SWAP, j, j + 1)
+
+
+def cocktail_shaker_sort(arr):
+    start = 0
+    end = len(arr) - 1
+    swapped = True
+    while swapped:
+        swapped = False
+        for i in range(start, end):
+            yield (COMPARE, i, i + 1)
+            if arr[i] > arr[i + 1]:
+                arr[i], arr[i + 1] = arr[i + 1], arr[i]
+                swapped = True
+                yield (SWAP, i, i + 1)
+
+        if not swapped:
+            break
+
+        swapped = False
+        end -= 1
+
+        for i in range(end - 1, start - 1, -1):
+            yield (COMPARE, i, i + 1)
+            if arr[i] > arr[i + 1]:
+                arr[i], arr[i + 1] = arr[i + 1], arr[i]
+                swapped = True
+                yield (SWAP, i, i + 1)
+
+        start += 1
+
+
+def odd_even_sort(arr):
+    n = len(arr)
+    is_sorted = False
+    while not is_sorted:
+        is_sorted = True
+        for start in (1, 0):  # Odd index pass, then even index pass
+            for i in range(start, n - 1, 2):
+                yield (COMPARE, i, i + 1)
+                if arr[i] > arr[i + 1]:
+                    arr[i], arr[i + 1] = arr[i + 1], arr[i]
+                    is_sorted = False
+                    yield (SWAP, i, i + 1)
+
+
+def selection_sort(arr):
+    n = len(arr)
+    for i in range(n):
+        min_index = i
+        for j in range(i + 1, n):
+            yield (COMPARE, j, min_index)
+            if arr[j] < arr[min_index]:
+                min_index = j
+        arr[i], arr[min_index] = arr[min_index], arr[i]
+        yield (SWAP, i, min_index)
+
+
+def insertion_sort(arr, left=0, right=None):
+    """Insertion sort of arr[left..right] (inclusive) by shifting"""
+    if right is None:
+        right = len(arr) - 1
+    for i in range(left + 1, right + 1):
+        key = arr[i]
+        j = i - 1
+        while j >= left:
+            yield (COMPARE, j, i)
+            if not arr[j] > key:
+                break
+            arr[j + 1] = arr[j]
+            yield (WRITE, j + 1, arr[j])
+            j -= 1
+        arr[j + 1] = key
+        yield (WRITE, j + 1, key)
+
+
+def sift_down(arr, lo, root, size):
+    """Restore the max-heap arr[lo:lo+size] below root (a heap-relative index)"""
+    while True:
+        child = 2 * root + 1
+        if child >= size:
+            return
+        if child + 1 < size:
+            yield (COMPARE, lo + child, lo + child + 1)
+            if arr[lo + child] < arr[lo + child + 1]:
+                child += 1
+        yield (COMPARE, lo + root, lo + child)
+        if not arr[lo + root] < arr[lo + child]:
+            return
+        arr[lo + root], arr[lo + child] = arr[lo + child], arr[lo + root]
+        yield (SWAP, lo + root, lo + child)
+        root = child
+
+
+def heap_sort_range(arr, lo, hi):
+    """Heap sort of arr[lo:hi]"""
+    size = hi - lo
+    for root in range(size // 2 - 1, -1, -1):
+        yield from sift_down(arr, lo, root, size)
+    for end in range(size - 1, 0, -1):
+        arr[lo], arr[lo + end] = arr[lo + end], arr[lo]
+        yield (SWAP, lo, lo + end)
+        yield from sift_down(arr, lo, 0, end)
+
+
+def heap_sort(arr):
+    """Classic binary heap sort"""
+    yield from heap_sort_range(arr, 0, len(arr))
+
+
+def sift_down_bottom_up(arr, root, size):
+    """sift_down with Floyd's trick: about one comparison per level.
+
+    Walk down to a leaf along the larger children first, then back up to
+    where arr[root] belongs, and rotate the path above that point.
+    """
+    leaf = root
+    while 2 * leaf + 2 < size:
+        left = 2 * leaf + 1
+        yield (COMPARE, left, left + 1)
+        leaf = left + 1 if arr[left] < arr[left + 1] else left
+    if 2 * leaf + 1 < size:
+        leaf = 2 * leaf + 1
+    while True:
+        yield (COMPARE, leaf, root)
+        if not arr[leaf] < arr[root]:
+            break
+        leaf = (leaf - 1) // 2
+    value = arr[leaf]
+    arr[leaf] = arr[root]
+    yield (WRITE, leaf, arr[root])
+    while leaf > root:
+        leaf = (leaf - 1) // 2
+        value, arr[leaf] = arr[leaf], value
+        yield (WRITE, leaf, arr[leaf])
+
+
+def bottom_up_heap_sort(arr):
+    """Heap sort with bottom-up sift-downs, for fewer comparisons"""
+    size = len(arr)
+    for root in range(size // 2 - 1, -1, -1):
+        yield from sift_down_bottom_up(arr, root, size)
+    for end in range(size - 1, 0, -1):
+        arr[0], arr[end] = arr[end], arr[0]
+        yield (SWAP, 0, end)
+        yield from sift_down_bottom_up(arr, 0, end)
+
+
+def sift_down_ternary(arr, root, size):
+    """Restore the ternary max-heap arr[:size] below root"""
+    while True:
+        first = 3 * root + 1
+        if first >= size:
+            return
+        child = first
+        for other in range(first + 1, min(first + 3, size)):
+            yield (COMPARE, child, other)
+            if arr[child] < arr[other]:
+                child = other
+        yield (COMPARE, root, child)
+        if not arr[root] < arr[child]:
+            return
+        arr[root], arr[child] = arr[child], arr[root]
+        yield (SWAP, root, child)
+        root = child
+
+
+def ternary_heap_sort(arr):
+    """Heap sort on a three-way heap: shallower, so fewer swaps"""
+    size = len(arr)
+    for root in range((size - 2) // 3, -1, -1):
+        yield from sift_down_ternary(arr, root, size)
+    for end in range(size - 1, 0, -1):
+        arr[0], arr[end] = arr[end], arr[0]
+        yield (SWAP, 0, end)
+        yield from sift_down_ternary(arr, 0, end)
+
+
+def median_of_three(arr, a, b, c):
+    """Index of the median of arr[a], arr[b] and arr[c]"""
+    yield (COMPARE, a, b)
+    if arr[a] > arr[b]:
+        a, b = b, a
+    yield (COMPARE, b, c)
+    if not arr[b] > arr[c]:
+        return b
+    yield (COMPARE, a, c)
+    return c if arr[a] < arr[c] else a
+
+
+def partition3(arr, lo, hi, pivot):
+    """Three-way partition of arr[lo:hi] around arr[pivot] (Dijkstra).
+
+    Returns (lt, gt): arr[lo:lt] < pivot, arr[lt:gt] == pivot and
+    arr[gt:hi] > pivot, so runs of duplicates are finished in one pass.
+    """
+    arr[lo], arr[pivot] = arr[pivot], arr[lo]
+    yield (SWAP, lo, pivot)
+    value = arr[lo]
+    lt, i, gt = lo, lo + 1, hi
+    while i < gt:
+        # arr[lt] always holds a copy of the pivot value
+        yield (COMPARE, i, lt)
+        if arr[i] < value:
+            arr[lt], arr[i] = arr[i], arr[lt]
+            yield (SWAP, lt, i)
+            lt += 1
+            i += 1
+            continue
+        yield (COMPARE, i, lt)
+        if arr[i] > value:
+            gt -= 1
+            arr[i], arr[gt] = arr[gt], arr[i]
+            yield (SWAP, i, gt)
+        else:
+            i += 1
+    return lt, gt
+
+
+INSERTION_CUTOFF = 16  # Partitions this small are finished by insertion sort
+NINTHER_CUTOFF = 128   # Partitions this large take Tukey's ninther as pivot
+
+
+def quick_sort(arr):
+    """Introsort: quicksort that can neither go quadratic nor deep.
+
+    Pivots are the median of three (or the ninther on large partitions),
+    partitioning is three-way so duplicates do not degrade it, small
+    partitions are left to insertion sort, and only the smaller side is
+    recursed into, which bounds the depth at log2(n).  Should a partition
+    sequence still go wrong, heap sort takes over after 2*log2(n) levels.
+    """
+    def choose_pivot(lo, hi):
+        mid = (lo + hi) // 2
+        if hi - lo < NINTHER_CUTOFF:
+            return (yield from median_of_three(arr, lo, mid, hi - 1))
+        step = (hi - lo) // 8
+        a = yield from median_of_three(arr, lo, lo + step, lo + 2 * step)
+        b = yield from median_of_three(arr, mid - step, mid, mid + step)
+        c = yield from median_of_three(arr, hi - 1 - 2 * step, hi - 1 - step, hi - 1)
+        return (yield from median_of_three(arr, a, b, c))
+
+    def intro_sort(lo, hi, depth):
+        while hi - lo > INSERTION_CUTOFF:
+            if depth == 0:
+                yield from heap_sort_range(arr, lo, hi)
+                return
+            depth -= 1
+            pivot = yield from choose_pivot(lo, hi)
+            lt, gt = yield from partition3(arr, lo, hi, pivot)
+            # Recurse into the smaller side and loop on the larger one
+            if lt - lo < hi - gt:
+                yield from intro_sort(lo, lt, depth)
+                lo = gt
+            else:
+                yield from intro_sort(gt, hi, depth)
+                hi = lt
+        yield from insertion_sort(arr, lo, hi - 1)
+
+    n = len(arr)
+    yield from intro_sort(0, n, 2 * max(n, 1).bit_length())
+
+
+def merge_into(src, dst, lo, mid, hi, visible):
+    """Merge src[lo:mid] and src[mid:hi] into dst[lo:hi].
+
+    Only writes into the array being sorted are yielded (visible); the
+    index positions are the same in both, so compares always are.
+    """
+    i, j = lo, mid
+    for k in range(lo, hi):
+        if i < mid and j < hi:
+            yield (COMPARE, i, j)
+            take_left = not src[j] < src[i]
+        else:
+            take_left = i < mid
+        if take_left:
+            value = src[i]
+            i += 1
+        else:
+            value = src[j]
+            j += 1
+        dst[k] = value
+        if visible:
+            yield (WRITE, k, value)
+
+
+def ping_pong_merge_sort(arr):
+    """Bottom-up merge sort bouncing between arr and one buffer of n items.
+
+    Each pass merges from one into the other, so nothing is copied back.
+    Runs are insertion-sorted to 32 or 16 items first, whichever makes the
+    number of passes even and so leaves the result in arr.
+    """
+    n = len(arr)
+    if n < 2:
+        return
+    run, passes = 32, 0
+    while run << passes < n:
+        passes += 1
+    if passes % 2:
+        run //= 2
+    for lo in range(0, n, run):
+        yield from insertion_sort(arr, lo, min(lo + run, n) - 1)
+
+    yield (ALLOC, n, 0)
+    buffer = [None] * n  # The only allocation of the whole sort
+    src, dst = arr, buffer
+    width = run
+    while width < n:
+        for lo in range(0, n, 2 * width):
+            hi = min(lo + 2 * width, n)
+            yield (HIGHLIGHT, lo, hi)
+            yield from merge_into(src, dst, lo, min(lo + width, n), hi, dst is arr)
+        src, dst = dst, src
+        width *= 2
+
+
+def half_buffer_merge_sort(arr):
+    """Top-down merge sort that only copies left runs out: n/2 extra items"""
+    n = len(arr)
+    if n < 2:
+        return
+    yield (ALLOC, n // 2, 0)
+    buffer = [None] * (n // 2)
+
+    def sort(lo, hi):
+        if hi - lo <= 16:
+            yield from insertion_sort(arr, lo, hi - 1)
+            return
+        mid = (lo + hi) // 2
+        yield from sort(lo, mid)
+        yield from sort(mid, hi)
+        yield (COMPARE, mid - 1, mid)
+        if not arr[mid] < arr[mid - 1]:
+            return  # Already in order
+
+        left = mid - lo
+        for t in range(left):
+            buffer[t] = arr[lo + t]
+        i, j, k = 0, mid, lo
+        # The right run is merged in place; only the left one was moved out
+        while i < left and j < hi:
+            yield (COMPARE, lo + i, j)
+            if arr[j] < buffer[i]:
+                value = arr[j]
+                j += 1
+            else:
+                value = buffer[i]
+                i += 1
+            arr[k] = value
+            yield (WRITE, k, value)
+            k += 1
+        while i < left:
+            arr[k] = buffer[i]
+            yield (WRITE, k, buffer[i])
+            i += 1
+            k += 1
+
+    yield from sort(0, n)
+
+
+def swap_blocks(arr, a, b, count):
+    for i in range(count):
+        arr[a + i], arr[b + i] = arr[b + i], arr[a + i]
+        yield (SWAP, a + i, b + i)
+
+
+def rotate(arr, lo, mid, hi):
+    """Exchange arr[lo:mid] and arr[mid:hi] by swapping blocks"""
+    i, j = mid - lo, hi - mid
+    while i != j:
+        if i > j:
+            yield from swap_blocks(arr, mid - i, mid, j)
+            i -= j
+        else:
+            yield from swap_blocks(arr, mid - i, mid + j - i, i)
+            j -= i
+    yield from swap_blocks(arr, mid - i, mid, i)
+
+
+def sym_merge(arr, lo, mid, hi):
+    """Merge arr[lo:mid] and arr[mid:hi] without a buffer (Kim & Kutzner)"""
+    if mid - lo == 1:
+        # Binary search for arr[lo]'s place in the right run and bubble it there
+        i, j = mid, hi
+        while i < j:
+            h = (i + j) // 2
+            yield (COMPARE, h, lo)
+            if arr[h] < arr[lo]:
+                i = h + 1
+            else:
+                j = h
+        for k in range(lo, i - 1):
+            arr[k], arr[k + 1] = arr[k + 1], arr[k]
+            yield (SWAP, k, k + 1)
+        return
+    if hi - mid == 1:
+        i, j = lo, mid
+        while i < j:
+            h = (i + j) // 2
+            yield (COMPARE, mid, h)
+            if not arr[mid] < arr[h]:
+                i = h + 1
+            else:
+                j = h
+        for k in range(mid, i, -1):
+            arr[k], arr[k - 1] = arr[k - 1], arr[k]
+            yield (SWAP, k, k - 1)
+        return
+
+    # Find the split that is symmetric around the centre, rotate the
+    # middle part into place and merge both sides the same way
+    centre = (lo + hi) // 2
+    total = centre + mid
+    if mid > centre:
+        start, r = total - hi, centre
+    else:
+        start, r = lo, mid
+    p = total - 1
+    while start < r:
+        c = (start + r) // 2
+        yield (COMPARE, p - c, c)
+        if not arr[p - c] < arr[c]:
+            start = c + 1
+        else:
+            r = c
+    end = total - start
+    if start < mid < end:
+        yield from rotate(arr, start, mid, end)
+    if lo < start < centre:
+        yield from sym_merge(arr, lo, start, centre)
+    if centre < end < hi:
+        yield from sym_merge(arr, centre, end, hi)
+
+
+def sym_merge_sort(arr):
+    """Stable merge sort with no buffer at all, O(n log^2 n) by rotations"""
+    n = len(arr)
+    block = 20
+    for lo in range(0, n, block):
+        yield from insertion_sort(arr, lo, min(lo + block, n) - 1)
+    width = block
+    while width < n:
+        for lo in range(0, n - width, 2 * width):
+            yield (HIGHLIGHT, lo, min(lo + 2 * width, n))
+            yield from sym_merge(arr, lo, lo + width, min(lo + 2 * width, n))
+        width *= 2
+
+
+def merge_sort_for_budget(n, memory_budget=None):
+    """The merge sort for n items that needs no more than memory_budget extra slots"""
+    if memory_budget is None or memory_budget >= n:
+        return ping_pong_merge_sort
+    if memory_budget >= n // 2:
+        return half_buffer_merge_sort
+    return sym_merge_sort
+
+
+def merge_sort(arr, memory_budget=None):
+    """Merge sort picked by memory budget (extra items; None means no limit)"""
+    yield from merge_sort_for_budget(len(arr), memory_budget)(arr)
+
+
+def merge_in_place(arr, start, mid, end):
+    """Merge sorted arr[start..mid] and arr[mid+1..end] by shifting"""
+    left = start
+    right = mid + 1
+    while left <= mid and right <= end:
+        yield (COMPARE, left, right)
+        if arr[left] <= arr[right]:
+            left += 1
+        else:
+            # Shift the left run one place right and drop the value in
+            value = arr[right]
+            for i in range(right, left, -1):
+                arr[i] = arr[i - 1]
+                yield (WRITE, i, arr[i])
+            arr[left] = value
+            yield (WRITE, left, value)
+            left += 1
+            mid += 1
+            right += 1
+
+
+def in_place_merge_sort(arr):
+    def merge_sort_recursive(start, end):
+        if start >= end:
+            return
+        mid = (start + end) // 2
+        yield from merge_sort_recursive(start, mid)
+        yield from merge_sort_recursive(mid + 1, end)
+        yield (COMPARE, mid, mid + 1)
+        # If already sorted, no need to merge
+        if arr[mid] > arr[mid + 1]:
+            yield from merge_in_place(arr, start, mid, end)
+
+    yield from merge_sort_recursive(0, len(arr) - 1)
+
+
+RADIX_BITS = (8, 11, 16)  # Digit widths the radix sorts are tuned for
+
+
+def lsd_radix_sort(arr, bits=8):
+    """LSD radix sort of integers, one stable counting pass per bits-bit digit.
+
+    Keys are taken relative to the minimum, so negative values work too.
+    The passes ping-pong between arr and a single buffer, and reuse one
+    array of counts, all allocated up front; a pass is skipped when all
+    keys share its digit.
+    """
+    n = len(arr)
+    if n < 2:
+        return
+    low = int(min(arr))
+    span = int(max(arr)) - low
+    radix = 1 << bits
+    mask = radix - 1
+    yield (ALLOC, n + radix, 0)
+    buffer = [0] * n
+    counts = [0] * radix
+    src, dst = arr, buffer
+
+    shift = 0
+    while span >> shift:
+        for digit in range(radix):
+            counts[digit] = 0
+        for value in src:
+            counts[(value - low) >> shift & mask] += 1
+        if max(counts) == n:
+            shift += bits
+            continue  # Every key has the same digit here
+        # Exclusive prefix sums: where each digit's items start
+        total = 0
+        for digit in range(radix):
+            counts[digit], total = total, total + counts[digit]
+        visible = dst is arr
+        for i in range(n):
+            value = src[i]
+            digit = (value - low) >> shift & mask
+            dst[counts[digit]] = value
+            # Writes into the buffer are invisible, so show the scan instead
+            yield (WRITE, counts[digit], value) if visible else (HIGHLIGHT, i, i + 1)
+            counts[digit] += 1
+        src, dst = dst, src
+        shift += bits
+
+    if src is not arr:
+        for i in range(n):
+            arr[i] = src[i]
+            yield (WRITE, i, src[i])
+
+
+def american_flag_sort(arr, bits=8):
+    """In-place MSD radix sort: three radix-sized arrays of extra memory.
+
+    Each bucket range is permuted into place by following cycles of
+    swaps, then its sub-buckets are sorted on the next digit; ranges of
+    32 items or fewer are finished by insertion sort.  The counts, heads
+    and tails arrays are allocated once and refilled for every range.
+    """
+    n = len(arr)
+    if n < 2:
+        return
+    low = int(min(arr))
+    span = int(max(arr)) - low
+    if not span:
+        return
+    radix = 1 << bits
+    mask = radix - 1
+    yield (ALLOC, 3 * radix, 0)
+    counts = [0] * radix
+    heads = [0] * radix
+    tails = [0] * radix
+    pending = [(0, n, (span.bit_length() - 1) // bits * bits)]
+    while pending:
+        start, end, shift = pending.pop()
+        if end - start <= 32:
+            yield from insertion_sort(arr, start, end - 1)
+            continue
+        for digit in range(radix):
+            counts[digit] = 0
+        for i in range(start, end):
+            counts[(arr[i] - low) >> shift & mask] += 1
+        position = start
+        for digit in range(radix):
+            heads[digit] = position
+            position += counts[digit]
+            tails[digit] = position
+
+        for digit in range(radix):
+            while heads[digit] < tails[digit]:
+                here = heads[digit]
+                other = (arr[here] - low) >> shift & mask
+                if other == digit:
+                    heads[digit] += 1
+                else:
+                    # Send arr[here] to its bucket and take that slot's item back
+                    there = heads[other]
+                    arr[here], arr[there] = arr[there], arr[here]
+                    yield (SWAP, here, there)
+                    heads[other] += 1
+
+        if shift:
+            for digit in range(radix):
+                if counts[digit] > 1:
+                    pending.append((tails[digit] - counts[digit], tails[digit], shift - bits))
+
+
+def radix_sort_array(values, bits=16):
+    """Sort an integer NumPy array in place with vectorized LSD passes.
+
+    For arrays far too large to animate.  Each pass takes its digit's
+    histogram with np.bincount (skipping the pass if it is trivial) and
+    scatters by a stable argsort of the 8/16-bit digits, which NumPy
+    itself performs as a counting sort.  Two key buffers are reused
+    across all passes.
+    """
+    n = len(values)
+    if n < 2:
+        return values
+    low = int(values.min())
+    span = int(values.max()) - low
+    radix = 1 << bits
+    digit_type = np.uint8 if bits <= 8 else np.uint16
+    keys = (values - low).astype(np.uint64)
+    spare = np.empty_like(keys)
+    digits = np.empty(n, dtype=digit_type)
+    shift = 0
+    while span >> shift:
+        np.bitwise_and(keys >> np.uint64(shift), np.uint64(radix - 1), out=digits, casting="unsafe")
+        if np.bincount(digits, minlength=radix).max() < n:
+            np.take(keys, np.argsort(digits, kind="stable"), out=spare)
+            keys, spare = spare, keys
+        shift += bits
+    values[:] = keys + np.uint64(low) if low >= 0 else keys.astype(np.int64) + low
+    return values
+
+
+DENSE_RATIO = 2  # Counting sort when the key range is at most this many times n
+
+
+def counting_sort(arr):
+    """Counting sort of integers: O(n + k) time and k counters, k = max - min + 1.
+
+    Equal integers are indistinguishable, so rewriting arr from the counts
+    gives the same result a stable sort would.  Keys spread over more than
+    DENSE_RATIO * n values are left to bucket_sort instead.
+    """
+    n = len(arr)
+    if n < 2:
+        return
+    low = int(min(arr))
+    k = int(max(arr)) - low + 1
+    if k > DENSE_RATIO * n:
+        yield from bucket_sort(arr)
+        return
+    yield (ALLOC, k, 0)
+    counts = [0] * k
+    for value in arr:
+        counts[value - low] += 1
+    i = 0
+    for offset in range(k):
+        value = low + offset
+        for _ in range(counts[offset]):
+            arr[i] = value
+            yield (WRITE, i, value)
+            i += 1
+
+
+def pigeonhole_sort(arr):
+    """Pigeonhole sort: items are moved (not recounted) through k holes, stably.
+
+    Like counting_sort it hands keys spread over more than DENSE_RATIO * n
+    values to bucket_sort.
+    """
+    n = len(arr)
+    if n < 2:
+        return
+    low = int(min(arr))
+    k = int(max(arr)) - low + 1
+    if k > DENSE_RATIO * n:
+        yield from bucket_sort(arr)
+        return
+    yield (ALLOC, k + n, 0)
+    holes = [[] for _ in range(k)]
+    for i in range(n):
+        holes[arr[i] - low].append(arr[i])
+        yield (HIGHLIGHT, i, i + 1)
+    i = 0
+    for hole in holes:
+        for value in hole:
+            arr[i] = value
+            yield (WRITE, i, value)
+            i += 1
+
+
+def bucket_sort(arr):
+    """Bucket sort of integer keys spread over a wide range.
+
+    A range of m items is dealt into m buckets that split its key range
+    evenly, so evenly spread keys take linear time.  The buckets are laid
+    out in one n-slot buffer by counting them first; the buffer and the
+    counts are allocated once and reused for every range.
+
+    Buckets of up to 32 items are finished by insertion sort and larger
+    ones bucket-sorted again on their own narrower range, from an explicit
+    stack.  A bucket holding more than half of its range means the keys
+    are skewed (say powers of n), so it is heap sorted instead: each level
+    at least halves the ranges, and the worst case is O(n log n).
+    """
+    n = len(arr)
+    if n < 2:
+        return
+    yield (ALLOC, 2 * n, 0)
+    buffer = [0] * n
+    counts = [0] * n
+    pending = [(0, n)]
+    while pending:
+        lo, hi = pending.pop()
+        m = hi - lo
+        low = high = int(arr[lo])
+        for i in range(lo + 1, hi):
+            value = int(arr[i])
+            if value < low:
+                low = value
+            elif value > high:
+                high = value
+        if low == high:
+            continue
+        width = high - low + 1
+        for b in range(m):
+            counts[b] = 0
+        for i in range(lo, hi):
+            counts[(int(arr[i]) - low) * m // width] += 1
+        # Exclusive prefix sums: where each bucket starts in the buffer
+        total = 0
+        for b in range(m):
+            counts[b], total = total, total + counts[b]
+        for i in range(lo, hi):
+            value = arr[i]
+            b = (int(value) - low) * m // width
+            buffer[counts[b]] = value
+            counts[b] += 1
+            yield (HIGHLIGHT, i, i + 1)
+        for i in range(m):
+            arr[lo + i] = buffer[i]
+            yield (WRITE, lo + i, buffer[i])
+
+        start = lo  # counts[b] is now where bucket b ends
+        for b in range(m):
+            end = lo + counts[b]
+            if end - start <= 32:
+                yield from insertion_sort(arr, start, end - 1)
+            elif 2 * (end - start) > m:
+                yield from heap_sort_range(arr, start, end)
+            else:
+                pending.append((start, end))
+            start = end
+
+
+def integer_sort(arr):
+    """Integer sort picked by the key range.
+
+    Counting sort when max - min is at most DENSE_RATIO times n (a
+    permutation of 1..n always is), which is O(n) time and memory.
+    Otherwise bucket sort: linear on evenly spread keys, O(n log n) on
+    skewed ones, with 2n slots of auxiliary memory.
+    """
+    n = len(arr)
+    if n < 2:
+        return
+    if max(arr) - min(arr) < DENSE_RATIO * n:
+        yield from counting_sort(arr)
+    else:
+        yield from bucket_sort(arr)
+
+
+def is_sorted(arr):
+    for i in range(1, len(arr)):
+        if arr[i] < arr[i - 1]:
+            return False
+    return True
+
+
+def shuffle(arr, rng=random):
+    """Fisher-Yates shuffle expressed as swap operations"""
+    for i in range(len(arr) - 1, 0, -1):
+        j = rng.randint(0, i)
+        arr[i], arr[j] = arr[j], arr[i]
+        yield (SWAP, i, j)
+
+
+def bogo_sort(arr, rng=random):
+    while True:
+        for i in range(1, len(arr)):
+            yield (COMPARE, i - 1, i)
+            if arr[i] < arr[i - 1]:
+                break
+        else:
+            return
+        yield from shuffle(arr, rng)
+
+
+def survivor_runs(arr):
+    """Split arr into the runs Stalin sort with reentry would keep.
+
+    One patience-style pass: each element joins the first run whose tail
+    is <= it, which is the run it would survive in after that many rounds
+    of reentry.  The tails stay strictly decreasing, so that run is found
+    by binary search.  Yields the compares; returns a list of runs, each a
+    list of (value, original index) pairs.
+    """
+    runs = []
+    for i in range(len(arr)):
+        value = arr[i]
+        lo, hi = 0, len(runs)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            tail, origin = runs[mid][-1]
+            yield (COMPARE, i, origin)
+            if tail <= value:
+                hi = mid
+            else:
+                lo = mid + 1
+        if lo == len(runs):
+            runs.append([])
+        runs[lo].append((value, i))
+    return runs
+
+
+def cursor_less(runs, a, b):
+    """Whether the item under cursor a goes before the one under cursor b.
+
+    A cursor is (run, position).  Ties go to the lower run, which keeps
+    equal values in their original order.
+    """
+    (ra, ia), (rb, ib) = a, b
+    value_a, origin_a = runs[ra][ia]
+    value_b, origin_b = runs[rb][ib]
+    yield (COMPARE, origin_a, origin_b)
+    return value_a <= value_b if ra < rb else value_a < value_b
+
+
+def sift_cursor(runs, heap, root):
+    """Sift a cursor down a binary min-heap of cursors"""
+    size = len(heap)
+    while 2 * root + 1 < size:
+        child = 2 * root + 1
+        if child + 1 < size and (yield from cursor_less(runs, heap[child + 1], heap[child])):
+            child += 1
+        if not (yield from cursor_less(runs, heap[child], heap[root])):
+            return
+        heap[root], heap[child] = heap[child], heap[root]
+        root = child
+
+
+def merge_runs(arr, runs):
+    """k-way merge of sorted runs into arr[0:] through a binary heap.
+
+    The heap holds a cursor into every run that is not used up; every
+    comparison it makes is yielded, about 2 log k per item taken.
+    """
+    heap = [(r, 0) for r in range(len(runs))]
+    yield (ALLOC, len(heap), 0)
+    for root in reversed(range(len(heap) // 2)):
+        yield from sift_cursor(runs, heap, root)
+    for k in range(len(arr)):
+        r, i = heap[0]
+        value = runs[r][i][0]
+        if i + 1 < len(runs[r]):
+            heap[0] = (r, i + 1)
+        else:
+            last = heap.pop()
+            if heap:
+                heap[0] = last
+        if heap:
+            yield from sift_cursor(runs, heap, 0)
+        arr[k] = value
+        yield (WRITE, k, value)
+
+
+def stalin_sort(arr):
+    """Stalin sort with reentry, without the recursion.
+
+    All survivor runs come out of one pass and are merged at once, so
+    it is O(n log k) for k runs instead of O(n * k).
+    """
+    yield (ALLOC, len(arr), 0)  # The runs between them hold all of arr
+    runs = yield from survivor_runs(arr)
+    if len(runs) > 1:
+        yield from merge_runs(arr, runs)
+
+
+# Name -> generator function, for front ends and headless runs
+ALGORITHMS = {
+    "Bubble Sort": bubble_sort,
+    "Selection Sort": selection_sort,
+    "Insertion Sort": insertion_sort,
+    "Quick Sort": quick_sort,
+    "Heap Sort": heap_sort,
+    "Bottom-Up Heap Sort": bottom_up_heap_sort,
+    "Ternary Heap Sort": ternary_heap_sort,
+    "Merge Sort": merge_sort,
+    "Ping-Pong Merge Sort": ping_pong_merge_sort,
+    "Half-Buffer Merge Sort": half_buffer_merge_sort,
+    "SymMerge Sort": sym_merge_sort,
+    "In-Place Merge Sort": in_place_merge_sort,
+    "Grail Sort": grail_sort,
+    "Grail Sort (Static Buffer)": grail_sort_static_buffer,
+    "Grail Sort (Dynamic Buffer)": grail_sort_dynamic_buffer,
+    "Bogo Sort": bogo_sort,
+    "Odd-Even Sort": odd_even_sort,
+    "Odd-Even Merge Sort": odd_even_merge_sort,
+    "Bitonic Sort": bitonic_sort,
+    "Tim Sort": tim_sort,
+    "LSD Radix Sort": lsd_radix_sort,
+    "LSD Radix Sort (2^11)": partial(lsd_radix_sort, bits=11),
+    "LSD Radix Sort (2^16)": partial(lsd_radix_sort, bits=16),
+    "American Flag Sort": american_flag_sort,
+    "Counting Sort": counting_sort,
+    "Pigeonhole Sort": pigeonhole_sort,
+    "Bucket Sort": bucket_sort,
+    "Integer Sort": integer_sort,
+    "Cocktail Shaker Sort": cocktail_shaker_sort,
+    "Stalin Sort": stalin_sort,
+}
@@ -0,0 +1,43 @@
+from collections import deque
+
+# Operation codes yielded by every sorting generator.
+# Each operation is a 3-tuple of ints: (code, a, b)
+COMPARE = 0    # (COMPARE, i, j)     - arr[i] was compared with arr[j]
+SWAP = 1       # (SWAP, i, j)        - arr[i] and arr[j] were exchanged
+WRITE = 2      # (WRITE, i, value)   - arr[i] was overwritten with value
+HIGHLIGHT = 3  # (HIGHLIGHT, lo, hi) - indices lo..hi-1 are of interest
+ALLOC = 4      # (ALLOC, size, 0)    - an auxiliary buffer of size slots was allocated
+
+OP_NAMES = {
+    COMPARE: "compare",
+    SWAP: "swap",
+    WRITE: "write",
+    HIGHLIGHT: "highlight",
+    ALLOC: "alloc",
+}
+
+
+def run(operations):
+    """Drain an operation stream at full speed without looking at it"""
+    deque(operations, maxlen=0)
+
+
+def apply_op(arr, op):
+    """Replay a single operation onto arr (compare/highlight are no-ops)"""
+    code, a, b = op
+    if code == SWAP:
+        arr[a], arr[b] = arr[b], arr[a]
+    elif code == WRITE:
+        arr[a] = b
+
+
+def touched_indices(op):
+    """Indices an operation refers to, for highlighting"""
+    code, a, b = op
+    if code == WRITE:
+        return (a,)
+    if code == HIGHLIGHT:
+        return range(a, b)
+    if code == ALLOC:
+        return ()
+    return (a, b)
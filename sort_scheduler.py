@@ -0,0 +1,92 @@
+import time
+from itertools import islice
+
+# Operations per frame for each speed setting; None means as many as fit
+# in the frame budget
+SPEEDS = (1, 2, 5, 10, 25, 50, 100, 250, 1000, 10000, None)
+
+# How many operations run between checks of the frame deadline
+CHUNK = 64
+
+
+class SortScheduler:
+    """Advances an operation stream a slice at a time from the main loop.
+
+    Instead of running a sort to completion inside an event handler, the
+    main loop calls tick() once per frame.  Each tick consumes up to the
+    current speed's operations-per-frame, but never runs past the frame
+    time budget, so the window stays responsive at every speed.
+    """
+
+    def __init__(self, on_operation, speed=3):
+        self.on_operation = on_operation
+        self.speed = speed  # Index into SPEEDS
+        self.operations = None
+        self.on_finish = None
+        self.paused = False
+
+    @property
+    def running(self):
+        return self.operations is not None
+
+    @property
+    def ops_per_frame(self):
+        return SPEEDS[self.speed]
+
+    def speed_label(self):
+        ops = self.ops_per_frame
+        label = "max" if ops is None else str(ops)
+        return label + (" (paused)" if self.paused else "")
+
+    def start(self, operations, on_finish=None):
+        self.operations = iter(operations)
+        self.on_finish = on_finish
+        self.paused = False
+
+    def stop(self):
+        """Abandon the current sort without calling on_finish"""
+        self.operations = None
+        self.on_finish = None
+
+    def faster(self):
+        self.speed = min(self.speed + 1, len(SPEEDS) - 1)
+
+    def slower(self):
+        self.speed = max(self.speed - 1, 0)
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+
+    def step(self):
+        """Run a single operation (meant for use while paused)"""
+        if self.running:
+            self._advance(1, None)
+
+    def tick(self, budget):
+        """Run this frame's share of operations within budget seconds"""
+        if not self.running or self.paused:
+            return 0
+        return self._advance(self.ops_per_frame, time.perf_counter() + budget)
+
+    def _advance(self, limit, deadline):
+        on_operation = self.on_operation
+        done = 0
+        while limit is None or done < limit:
+            chunk = CHUNK if limit is None else min(CHUNK, limit - done)
+            count = 0
+            for op in islice(self.operations, chunk):
+                on_operation(op)
+                count += 1
+            done += count
+            if count < chunk:
+                self._finish()
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        return done
+
+    def _finish(self):
+        on_finish = self.on_finish
+        self.stop()
+        if on_finish:
+            on_finish()
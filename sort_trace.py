@@ -0,0 +1,207 @@
+"""Compact binary recording of a sort's operation stream.
+
+A trace file holds the operations of one run, delta/varint encoded, split
+into segments of ``keyframe_interval`` operations.  Every segment starts
+with a full snapshot of the array, so rebuilding the array at any point
+costs one snapshot copy plus at most ``keyframe_interval`` replayed ops.
+
+Layout (all integers little-endian int64):
+
+    header    magic, array length, keyframe interval, op count,
+              keyframe count, index offset
+    segments  [snapshot (length * int64)][encoded ops] ...
+    index     (op index, snapshot offset, ops offset) per keyframe
+
+Readers memory-map the file, so million-element traces are never loaded
+into Python lists.
+"""
+import mmap
+import struct
+from array import array
+
+from sort_ops import SWAP, WRITE, apply_op
+
+MAGIC = b"SORTTRC1"
+HEADER = struct.Struct("<8sqqqqq")
+INDEX_ENTRY = 3  # int64 fields per keyframe index entry
+FLUSH_SIZE = 1 << 16
+
+
+def _zigzag(value):
+    return value << 1 if value >= 0 else ((-value) << 1) - 1
+
+
+def _unzigzag(value):
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _put_varint(buf, value):
+    while value > 0x7F:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+class TraceWriter:
+    """Streams operations into a trace file as they are produced"""
+
+    def __init__(self, path, initial_array, keyframe_interval=4096):
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+        self.keyframe_interval = keyframe_interval
+        self.state = array("q", initial_array)  # Shadow copy for snapshots
+        self.op_count = 0
+        self.index = array("q")
+        self._file = open(path, "wb")
+        self._buf = bytearray(HEADER.size)  # Header is patched in close()
+        self._pos = HEADER.size
+        self._prev = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _flush(self):
+        self._file.write(self._buf)
+        self._buf = bytearray()
+
+    def _keyframe(self):
+        self._flush()
+        snapshot_offset = self._pos
+        self.state.tofile(self._file)
+        self._pos += len(self.state) * self.state.itemsize
+        self.index.extend((self.op_count, snapshot_offset, self._pos))
+        self._prev = 0  # Segments decode independently of each other
+
+    def record(self, op):
+        if self.op_count % self.keyframe_interval == 0:
+            self._keyframe()
+        code, a, b = op
+        buf = self._buf
+        start = len(buf)
+        buf.append(code)
+        _put_varint(buf, _zigzag(a - self._prev))
+        if code == WRITE:
+            _put_varint(buf, _zigzag(b))
+        else:
+            _put_varint(buf, _zigzag(b - a))
+        self._prev = a
+        self._pos += len(buf) - start
+        self.op_count += 1
+        if code == SWAP or code == WRITE:
+            apply_op(self.state, op)
+        if len(buf) >= FLUSH_SIZE:
+            self._flush()
+
+    def record_all(self, operations):
+        for op in operations:
+            self.record(op)
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self.op_count == 0:
+            self._keyframe()
+        self._flush()
+        index_offset = self._pos
+        self.index.tofile(self._file)
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, len(self.state), self.keyframe_interval,
+                                     self.op_count, len(self.index) // INDEX_ENTRY,
+                                     index_offset))
+        self._file.close()
+
+
+class TraceReader:
+    """Memory-mapped access to a trace written by TraceWriter"""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.length, self.keyframe_interval, self.op_count,
+         keyframes, index_offset) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a sort trace")
+        self._view = memoryview(self._map)
+        self.index = self._view[index_offset:index_offset + keyframes * INDEX_ENTRY * 8].cast("q")
+
+    def __len__(self):
+        return self.op_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.index.release()
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+    def _decode(self, pos, count):
+        """Yield count operations starting at byte offset pos of a segment"""
+        data = self._map
+        prev = 0
+        for _ in range(count):
+            code = data[pos]
+            pos += 1
+            fields = []
+            for _ in range(2):
+                value = shift = 0
+                while True:
+                    byte = data[pos]
+                    pos += 1
+                    value |= (byte & 0x7F) << shift
+                    if byte < 0x80:
+                        break
+                    shift += 7
+                fields.append(_unzigzag(value))
+            a = prev + fields[0]
+            b = fields[1] if code == WRITE else a + fields[1]
+            prev = a
+            yield (code, a, b)
+
+    def _segment(self, k):
+        i = k * INDEX_ENTRY
+        return self.index[i], self.index[i + 1], self.index[i + 2]
+
+    def snapshot(self, k):
+        """Copy of the array at keyframe k"""
+        _, snapshot_offset, ops_offset = self._segment(k)
+        state = array("q")
+        state.frombytes(self._view[snapshot_offset:ops_offset])
+        return state
+
+    def ops(self, start=0, stop=None):
+        """Iterate over operations start..stop-1"""
+        stop = self.op_count if stop is None else min(stop, self.op_count)
+        while start < stop:
+            k = start // self.keyframe_interval
+            op_index, _, ops_offset = self._segment(k)
+            count = min(op_index + self.keyframe_interval, stop) - op_index
+            for offset, op in enumerate(self._decode(ops_offset, count)):
+                if op_index + offset >= start:
+                    yield op
+            start = op_index + count
+
+    def state_at(self, position):
+        """The array after the first `position` operations have been applied"""
+        if not 0 <= position <= self.op_count:
+            raise IndexError("trace position out of range")
+        k = min(position // self.keyframe_interval, len(self.index) // INDEX_ENTRY - 1)
+        op_index, _, ops_offset = self._segment(k)
+        state = self.snapshot(k)
+        for op in self._decode(ops_offset, position - op_index):
+            apply_op(state, op)
+        return state
+
+
+def record(algorithm, arr, path, keyframe_interval=4096):
+    """Run algorithm on arr (in place) and write its trace to path"""
+    with TraceWriter(path, arr, keyframe_interval) as writer:
+        writer.record_all(algorithm(arr))
+    return writer.op_count
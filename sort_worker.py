@@ -0,0 +1,101 @@
+"""Run a sort in its own process over a shared-memory array.
+
+The worker writes straight into a ``multiprocessing.shared_memory`` block of
+int64 values, so there is no per-operation IPC at all: the front end just
+samples the buffer whenever it draws a frame.  The two slots after the
+array hold the worker's running array-write count and the nanoseconds it
+has spent sorting.
+"""
+import multiprocessing
+import time
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from sort_ops import SWAP, WRITE
+
+PUBLISH_EVERY = 1024  # Operations between updates of the shared write count
+
+# Spawn everywhere, so the worker starts the same way on every platform
+# and never inherits the front end's display from a fork
+CONTEXT = multiprocessing.get_context("spawn")
+
+
+def _run(shm_name, n, algorithm):
+    shm = SharedMemory(name=shm_name)
+    # A memoryview indexes faster than NumPy scalars in pure Python loops
+    view = shm.buf.cast("q")
+    arr = view[:n]
+    writes = 0
+    start = time.perf_counter_ns()
+    try:
+        for count, op in enumerate(algorithm(arr), 1):
+            code = op[0]
+            if code == SWAP:
+                writes += 2
+            elif code == WRITE:
+                writes += 1
+            if count % PUBLISH_EVERY == 0:
+                view[n] = writes
+                view[n + 1] = time.perf_counter_ns() - start
+        view[n] = writes
+        view[n + 1] = time.perf_counter_ns() - start
+    finally:
+        arr.release()
+        view.release()
+        shm.close()
+
+
+class SortWorker:
+    """A sort running in a child process, observed through shared memory"""
+
+    def __init__(self, values, algorithm):
+        self.n = len(values)
+        self.shm = SharedMemory(create=True, size=(self.n + 2) * 8)
+        self.buffer = np.ndarray((self.n + 2,), dtype=np.int64, buffer=self.shm.buf)
+        self.buffer[:self.n] = values
+        self.buffer[self.n:] = 0
+        self.array = self.buffer[:self.n]
+        self.previous = self.array.copy()
+        self.process = CONTEXT.Process(target=_run, args=(self.shm.name, self.n, algorithm), daemon=True)
+
+    def start(self):
+        self.process.start()
+
+    @property
+    def running(self):
+        return self.process.is_alive()
+
+    @property
+    def writes(self):
+        return int(self.buffer[self.n])
+
+    @property
+    def algorithm_ns(self):
+        """Time the worker has spent in the algorithm itself"""
+        return int(self.buffer[self.n + 1])
+
+    def changed_indices(self):
+        """Indices whose value changed since the previous call"""
+        current = self.array.copy()
+        changed = np.flatnonzero(current != self.previous)
+        self.previous = current
+        return changed
+
+    def result(self):
+        """Copy of the array as it is now"""
+        return self.array.copy()
+
+    def terminate(self):
+        if self.process.pid is None:
+            return  # Never started
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+
+    def close(self):
+        """Stop the worker and free the shared memory block"""
+        self.terminate()
+        del self.array, self.buffer
+        self.shm.close()
+        self.shm.unlink()
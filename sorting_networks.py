@@ -0,0 +1,139 @@
+"""Sorting networks: odd-even transposition, Batcher odd-even merge, bitonic.
+
+A network is a fixed list of stages, and the compare-exchanges within a
+stage touch disjoint pairs of positions, so a whole stage can run as one
+NumPy minimum/maximum over index arrays.  Networks depend only on n; they
+are built once per size and cached.
+
+``network_sort_array`` sorts along the last axis, so a (batch, n) array
+sorts every row at once through the same stages.  The generator versions
+animate the same networks one comparator at a time.
+
+Every comparator puts the smaller value at the lower position, which
+lets each network sort any n: positions past the end act as +infinity,
+and the comparators that would touch them are simply dropped.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from sort_ops import COMPARE, SWAP
+
+
+def _stage(lo, hi):
+    lo.setflags(write=False)
+    hi.setflags(write=False)
+    return lo, hi
+
+
+@lru_cache(maxsize=None)
+def odd_even_transposition_network(n):
+    """n alternating stages of (0,1),(2,3),... and (1,2),(3,4),..."""
+    phases = [_stage(lo, lo + 1) for lo in (np.arange(start, n - 1, 2) for start in (0, 1))]
+    return tuple(phases[phase % 2] for phase in range(n) if len(phases[phase % 2][0]))
+
+
+@lru_cache(maxsize=None)
+def odd_even_merge_network(n):
+    """Batcher's odd-even merge sort, O(n log^2 n) comparators in O(log^2 n) stages"""
+    stages = []
+    p = 1
+    while p < n:
+        k = p
+        while k >= 1:
+            # (lo, lo + k) for lo in the first half of each 2k group from
+            # k % p on, when both ends lie in the same 2p block
+            lo = np.arange(k % p, max(k % p, n - k))
+            lo = lo[((lo - k % p) % (2 * k) < k) & (lo // (2 * p) == (lo + k) // (2 * p))]
+            if len(lo):
+                stages.append(_stage(lo, lo + k))
+            k //= 2
+        p *= 2
+    return tuple(stages)
+
+
+@lru_cache(maxsize=None)
+def bitonic_network(n):
+    """Bitonic sort with the first stage of each merge flipped.
+
+    Comparing i with its mirror image instead of reversing every other
+    block keeps all comparators ascending.
+    """
+    stages = []
+    positions = np.arange(n)
+    p = 1
+    while p < n:
+        offset = positions % (2 * p)
+        lo = positions[offset < p]
+        hi = lo - offset[lo] + 2 * p - 1 - offset[lo]
+        stages.append(_stage(lo[hi < n], hi[hi < n]))
+        k = p // 2
+        while k >= 1:
+            lo = positions[(positions % (2 * k) < k) & (positions + k < n)]
+            stages.append(_stage(lo, lo + k))
+            k //= 2
+        p *= 2
+    return tuple(stages)
+
+
+NETWORKS = {
+    "odd-even transposition": odd_even_transposition_network,
+    "odd-even merge": odd_even_merge_network,
+    "bitonic": bitonic_network,
+}
+
+
+def network_sort_array(values, network="bitonic"):
+    """Sort a NumPy array in place along its last axis with a sorting network.
+
+    values may be (n,) or (..., n); every row goes through the same
+    stages at once, which is where networks beat a comparison sort.
+    """
+    # Positions first, so each gathered position is one contiguous row
+    work = np.ascontiguousarray(np.moveaxis(values, -1, 0))
+    for lo, hi in NETWORKS[network](work.shape[0]):
+        a = work[lo]
+        b = work[hi]
+        work[lo] = np.minimum(a, b)
+        work[hi] = np.maximum(a, b)
+    values[...] = np.moveaxis(work, 0, -1)
+    return values
+
+
+def odd_even_transposition_array(values):
+    """Odd-even transposition sort in place along the last axis.
+
+    A phase is one minimum/maximum over two strided views.  Unlike the
+    fixed network it stops after a pair of phases that changes nothing.
+    """
+    n = values.shape[-1]
+    changed = True
+    while changed:
+        changed = False
+        for start in (0, 1):
+            left = values[..., start:n - 1:2]
+            right = values[..., start + 1:n:2]
+            if not (left > right).any():
+                continue
+            smaller = np.minimum(left, right)
+            np.maximum(left, right, out=right)
+            left[...] = smaller
+            changed = True
+    return values
+
+
+def _run_network(arr, stages):
+    for lo, hi in stages:
+        for i, j in zip(lo.tolist(), hi.tolist()):
+            yield (COMPARE, i, j)
+            if arr[j] < arr[i]:
+                arr[i], arr[j] = arr[j], arr[i]
+                yield (SWAP, i, j)
+
+
+def odd_even_merge_sort(arr):
+    yield from _run_network(arr, odd_even_merge_network(len(arr)))
+
+
+def bitonic_sort(arr):
+    yield from _run_network(arr, bitonic_network(len(arr)))
@@ -0,0 +1,215 @@
+"""Stalin sort over streams too large to hold in memory.
+
+``survivors()`` is the plain Stalin filter: it lazily yields the
+non-decreasing survivors of any iterable, one item of state.  Rejected
+items can be handed to a callback, e.g. ``SpillFile.append``, instead of
+being dropped.
+
+``sort_stream()`` is Stalin sort with reentry on top of that, with
+bounded memory.  Each pass deals the input out to at most ``max_runs``
+survivor runs (the same patience-style pass as sort_algorithms), spills
+the runs and whatever fits none of them to disk, and the rejects are
+read back for another pass.  The runs are then merged externally.  On
+monotone-ish data such as log files nearly everything survives the first
+pass, e.g.
+
+    python stalin_stream.py --sort app.log > sorted.log
+"""
+import argparse
+import heapq
+import os
+import pickle
+import sys
+import tempfile
+from itertools import chain
+
+DEFAULT_BUFFER = 4096   # Items a SpillFile holds in memory before writing a batch
+DEFAULT_MAX_RUNS = 64   # Runs (and so open files) per pass
+
+
+class SpillFile:
+    """An append-only sequence of items kept on disk in pickled batches.
+
+    The temporary file is only created once buffer_size items have been
+    appended.  It can be read back once, in order.
+    """
+
+    def __init__(self, buffer_size=DEFAULT_BUFFER, dir=None):
+        self.buffer_size = buffer_size
+        self.dir = dir
+        self.buffer = []
+        self.file = None
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, item):
+        self.buffer.append(item)
+        self.count += 1
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        if self.file is None:
+            self.file = tempfile.TemporaryFile(dir=self.dir)
+        pickle.dump(self.buffer, self.file, pickle.HIGHEST_PROTOCOL)
+        self.buffer = []
+
+    def __iter__(self):
+        if self.file is None:
+            buffer, self.buffer = self.buffer, []
+            yield from buffer
+            return
+        self.flush()
+        self.file.seek(0)
+        try:
+            while True:
+                try:
+                    batch = pickle.load(self.file)
+                except EOFError:
+                    return
+                yield from batch
+        finally:
+            self.close()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+        self.buffer = []
+
+
+def flatten(chunks):
+    """Items of an iterable of chunks (lists, NumPy arrays, ...) one by one"""
+    return chain.from_iterable(
+        chunk.tolist() if hasattr(chunk, "tolist") else chunk for chunk in chunks)
+
+
+def read_lines(source):
+    """Lines of a path or an open text file (e.g. socket.makefile()), lazily"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as file:
+            yield from read_lines(file)
+        return
+    for line in source:
+        yield line.rstrip("\n")
+
+
+def survivors(iterable, key=None, rejected=None):
+    """Lazily yield the items that are >= every item kept before them"""
+    tail = None
+    for item in iterable:
+        k = item if key is None else key(item)
+        if tail is None or tail <= k:
+            tail = k
+            yield item
+        elif rejected is not None:
+            rejected(item)
+
+
+def _first_fit(tails, k):
+    """Index of the first of the strictly decreasing tails that is <= k"""
+    lo, hi = 0, len(tails)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if tails[mid] <= k:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def _deal(iterable, key, max_runs, buffer_size, dir):
+    """One pass: deal items out to up to max_runs survivor runs.
+
+    Each item joins the first run whose tail is <= it, the run it would
+    survive in under reentry.  Items that fit no run once all max_runs
+    exist are spilled for the next pass.  Returns (runs, rejected).
+    """
+    runs = []
+    tails = []
+    rejected = SpillFile(buffer_size, dir)
+    for item in iterable:
+        k = item if key is None else key(item)
+        r = _first_fit(tails, k)
+        if r == len(runs):
+            if len(runs) == max_runs:
+                rejected.append(item)
+                continue
+            runs.append(SpillFile(buffer_size, dir))
+            tails.append(k)
+        runs[r].append(item)
+        tails[r] = k
+    return runs, rejected
+
+
+def _merge(runs, key, buffer_size, dir):
+    """Merge sorted runs into a single SpillFile (ties go to earlier runs)"""
+    merged = SpillFile(buffer_size, dir)
+    for item in heapq.merge(*runs, key=key):
+        merged.append(item)
+    return merged
+
+
+def sort_stream(iterable, key=None, max_runs=DEFAULT_MAX_RUNS,
+                buffer_size=DEFAULT_BUFFER, dir=None):
+    """Lazily yield the items of iterable in stable sorted order.
+
+    Memory holds at most about 2 * max_runs * buffer_size items, and as
+    many temporary files are open at once.  A pass that leaves rejects
+    behind has kept at least max_runs items, so many passes only happen
+    on input far from sorted, which a regular sort handles better.
+    """
+    if max_runs < 2:
+        raise ValueError("max_runs must be at least 2")
+    passes = []  # One merged run per pass, oldest first
+    source = iterable
+    while True:
+        runs, rejected = _deal(source, key, max_runs, buffer_size, dir)
+        if runs:
+            passes.append(runs[0] if len(runs) == 1 else _merge(runs, key, buffer_size, dir))
+        # Fold the finished passes together before they hold too many files
+        if len(passes) == max_runs:
+            passes = [_merge(passes, key, buffer_size, dir)]
+        if not rejected:
+            break
+        source = rejected
+    yield from heapq.merge(*passes, key=key)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Stalin sort a text stream line by line")
+    parser.add_argument("input", nargs="?", help="file to read instead of stdin")
+    parser.add_argument("--sort", action="store_true",
+                        help="sort with reentry instead of only keeping the survivors")
+    parser.add_argument("--field", type=int,
+                        help="compare by this whitespace-separated field (0-based)")
+    parser.add_argument("--numeric", action="store_true", help="compare as numbers")
+    parser.add_argument("--max-runs", type=int, default=DEFAULT_MAX_RUNS,
+                        help="survivor runs kept per pass with --sort")
+    parser.add_argument("--buffer-size", type=int, default=DEFAULT_BUFFER,
+                        help="lines held in memory per run with --sort")
+    parser.add_argument("--tmpdir", help="directory for spill files")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    def key(line):
+        value = line if args.field is None else line.split()[args.field]
+        return float(value) if args.numeric else value
+
+    lines = read_lines(args.input if args.input else sys.stdin)
+    if args.sort:
+        out = sort_stream(lines, key, args.max_runs, args.buffer_size, args.tmpdir)
+    else:
+        out = survivors(lines, key)
+    for line in out:
+        sys.stdout.write(line + "\n")
+
+
+if __name__ == "__main__":
+    main()
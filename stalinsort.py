@@ -3,6 +3,10 @@ import pygame_gui
 import random
 import time
 
+import sort_algorithms
+from hud import Label
+from sort_ops import COMPARE, touched_indices
+
 # Colors and display settings
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -23,6 +27,11 @@ class StalinSortVisualizer:
         self.is_sorting = False
         self.start_time = 0
         self.elapsed_time = 0
+
+        # HUD text is only re-rendered when the value shown changes
+        self.timer_label = Label("Time: {:.2f} seconds", (10, 10))
+        self.size_label = Label("Array Size: {}", (10, 40))
+
         self.shuffle_array()
 
         # Create UI components
@@ -44,20 +53,15 @@ class StalinSortVisualizer:
 
     def draw_bars(self, highlighted_indices=None):
         screen.fill(BLACK)
-        font = pygame.font.SysFont(None, 30)
-        
+
         # Draw timer
         if self.is_sorting:
             current_time = time.time() - self.start_time
         else:
             current_time = self.elapsed_time
-        
-        timer_text = font.render(f"Time: {current_time:.2f} seconds", True, WHITE)
-        screen.blit(timer_text, (10, 10))
 
-        # Draw array size label
-        size_text = font.render(f"Array Size: {self.array_size}", True, WHITE)
-        screen.blit(size_text, (10, 40))
+        self.timer_label.draw(screen, current_time)
+        self.size_label.draw(screen, self.array_size)
 
         # Bar dimensions and scaling
         padding_top = 100
@@ -83,83 +87,21 @@ class StalinSortVisualizer:
         self.shuffle_array()
 
     def stalin_sort(self):
-        def stalin_sort_with_reentry(arr):
-            red_army = []
-            gulag_list = []
-
-            # Send soldiers out of order to gulag
-            for value in arr:
-                if not red_army or red_army[-1] <= value:
-                    red_army.append(value)
-                else:
-                    gulag_list.append(value)
-
-                # Visualize the current state
-                self.draw_bars()
-                time.sleep(0.05)  # Slow down to make visualization clearer
-
-            # If no soldiers in gulag, return sorted army
-            if not gulag_list:
-                return red_army
-
-            # Recursively sort gulag list and merge back
-            reentry_army = stalin_sort_with_reentry(gulag_list)
-            functioning_army = []
-
-            sorted_idx = 0
-            remaining_idx = 0
-
-            # Merge soldiers back into army
-            while (sorted_idx < len(red_army)) and (remaining_idx < len(reentry_army)):
-                if reentry_army[remaining_idx] < red_army[sorted_idx]:
-                    functioning_army.append(reentry_army[remaining_idx])
-                    remaining_idx += 1
-                else:
-                    functioning_army.append(red_army[sorted_idx])
-                    sorted_idx += 1
-
-                # Visualize merging process
-                self.draw_bars()
-                time.sleep(0.05)
-
-            # Add remaining soldiers to end of army
-            if (remaining_idx < len(reentry_army)) and (sorted_idx == len(red_army)):
-                functioning_army.extend(reentry_army[remaining_idx:])
-
-            if (sorted_idx < len(red_army)) and (remaining_idx == len(reentry_army)):
-                functioning_army.extend(red_army[sorted_idx:])
-
-            return functioning_army
-
         self.is_sorting = True
         self.start_time = time.time()
-        
-        # Perform Stalin Sort with reentry
-        self.array = stalin_sort_with_reentry(self.array)
-        
+
+        # Perform Stalin Sort with reentry, animating every array change
+        for op in sort_algorithms.stalin_sort(self.array):
+            if op[0] == COMPARE:
+                continue
+            pygame.event.pump()
+            self.draw_bars(touched_indices(op))
+            time.sleep(0.05)  # Slow down to make visualization clearer
+
         self.elapsed_time = time.time() - self.start_time
         self.is_sorting = False
         self.draw_bars()
 
-    def merge_sorted_lists(self, sorted_list, gulag_list):
-        merged = []
-        i, j = 0, 0
-
-        # Merge the two lists in sorted order
-        while i < len(sorted_list) and j < len(gulag_list):
-            if gulag_list[j] < sorted_list[i]:
-                merged.append(gulag_list[j])
-                j += 1
-            else:
-                merged.append(sorted_list[i])
-                i += 1
-
-        # Add any remaining elements from both lists
-        merged.extend(gulag_list[j:])
-        merged.extend(sorted_list[i:])
-        
-        return merged
-
 def main():
     running = True
     visualizer = StalinSortVisualizer()
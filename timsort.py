@@ -0,0 +1,429 @@
+"""Timsort, after CPython's listsort.
+
+The array is cut into natural runs (strictly descending ones are
+reversed in place); runs shorter than minrun are extended to minrun with
+binary insertion sort.  Runs go on a stack whose lengths are kept
+roughly Fibonacci-like so that merges stay balanced, and merges copy only
+the smaller run out and switch to galloping (exponential search) when one
+run keeps winning.  Already ordered input therefore sorts in about n
+comparisons.
+
+As in sort_algorithms, tim_sort is a generator that sorts arr in place
+and yields its operations.  Compares against items that were copied out
+to the merge buffer are reported at the position the item came from.
+"""
+from sort_ops import COMPARE, SWAP, WRITE, HIGHLIGHT, ALLOC
+
+MIN_GALLOP = 7
+
+
+def min_run(n):
+    """Run length so that n / minrun is a power of two or just below one"""
+    r = 0
+    while n >= 64:
+        r |= n & 1
+        n >>= 1
+    return n + r
+
+
+def _gallop_left(key, key_at, seq, base, n, hint, origin=0):
+    """Offset k in seq[base:base+n] with seq[base+k-1] < key <= seq[base+k].
+
+    The search starts at hint and probes 1, 3, 7, ... items away before
+    finishing with a binary search.  origin is added to the indices of
+    seq when reporting compares.
+    """
+    last, ofs = 0, 1
+    yield (COMPARE, key_at, origin + base + hint)
+    if seq[base + hint] < key:
+        limit = n - hint
+        while ofs < limit:
+            yield (COMPARE, key_at, origin + base + hint + ofs)
+            if not seq[base + hint + ofs] < key:
+                break
+            last, ofs = ofs, (ofs << 1) + 1
+        ofs = min(ofs, limit)
+        last, ofs = last + hint, ofs + hint
+    else:
+        limit = hint + 1
+        while ofs < limit:
+            yield (COMPARE, key_at, origin + base + hint - ofs)
+            if seq[base + hint - ofs] < key:
+                break
+            last, ofs = ofs, (ofs << 1) + 1
+        ofs = min(ofs, limit)
+        last, ofs = hint - ofs, hint - last
+    last += 1
+    while last < ofs:
+        m = last + ((ofs - last) >> 1)
+        yield (COMPARE, key_at, origin + base + m)
+        if seq[base + m] < key:
+            last = m + 1
+        else:
+            ofs = m
+    return ofs
+
+
+def _gallop_right(key, key_at, seq, base, n, hint, origin=0):
+    """Offset k in seq[base:base+n] with seq[base+k-1] <= key < seq[base+k]"""
+    last, ofs = 0, 1
+    yield (COMPARE, key_at, origin + base + hint)
+    if key < seq[base + hint]:
+        limit = hint + 1
+        while ofs < limit:
+            yield (COMPARE, key_at, origin + base + hint - ofs)
+            if not key < seq[base + hint - ofs]:
+                break
+            last, ofs = ofs, (ofs << 1) + 1
+        ofs = min(ofs, limit)
+        last, ofs = hint - ofs, hint - last
+    else:
+        limit = n - hint
+        while ofs < limit:
+            yield (COMPARE, key_at, origin + base + hint + ofs)
+            if key < seq[base + hint + ofs]:
+                break
+            last, ofs = ofs, (ofs << 1) + 1
+        ofs = min(ofs, limit)
+        last, ofs = last + hint, ofs + hint
+    last += 1
+    while last < ofs:
+        m = last + ((ofs - last) >> 1)
+        yield (COMPARE, key_at, origin + base + m)
+        if key < seq[base + m]:
+            ofs = m
+        else:
+            last = m + 1
+    return ofs
+
+
+class TimSort:
+    def __init__(self, arr):
+        self.arr = arr
+        self.runs = []  # Stack of (base, length) of runs still to merge
+        self.min_gallop = MIN_GALLOP
+
+    def sort(self):
+        arr = self.arr
+        n = len(arr)
+        if n < 2:
+            return
+        minrun = min_run(n)
+        lo = 0
+        while lo < n:
+            length = yield from self.count_run(lo, n)
+            if length < minrun:
+                forced = min(n - lo, minrun)
+                yield from self.binary_insertion_sort(lo, lo + forced, lo + length)
+                length = forced
+            yield (HIGHLIGHT, lo, lo + length)
+            self.runs.append((lo, length))
+            yield from self.merge_collapse()
+            lo += length
+        yield from self.merge_force_collapse()
+
+    def count_run(self, lo, hi):
+        """Length of the run at lo, reversing it first if it is descending"""
+        arr = self.arr
+        if lo + 1 == hi:
+            return 1
+        end = lo + 2
+        yield (COMPARE, lo + 1, lo)
+        if arr[lo + 1] < arr[lo]:
+            # Strictly descending, so reversing it keeps the sort stable
+            while end < hi:
+                yield (COMPARE, end, end - 1)
+                if not arr[end] < arr[end - 1]:
+                    break
+                end += 1
+            i, j = lo, end - 1
+            while i < j:
+                arr[i], arr[j] = arr[j], arr[i]
+                yield (SWAP, i, j)
+                i += 1
+                j -= 1
+        else:
+            while end < hi:
+                yield (COMPARE, end, end - 1)
+                if arr[end] < arr[end - 1]:
+                    break
+                end += 1
+        return end - lo
+
+    def binary_insertion_sort(self, lo, hi, start):
+        """Extend the sorted arr[lo:start] to arr[lo:hi]"""
+        arr = self.arr
+        for i in range(start, hi):
+            pivot = arr[i]
+            left, right = lo, i
+            while left < right:
+                mid = (left + right) >> 1
+                yield (COMPARE, i, mid)
+                if pivot < arr[mid]:
+                    right = mid
+                else:
+                    left = mid + 1
+            for j in range(i, left, -1):
+                arr[j] = arr[j - 1]
+                yield (WRITE, j, arr[j])
+            arr[left] = pivot
+            yield (WRITE, left, pivot)
+
+    def merge_collapse(self):
+        """Merge until the run lengths satisfy Timsort's stack invariants:
+        A > B + C and B > C for the top three runs (checked one level
+        deeper too, as fixed after the 2015 proof of the original)"""
+        runs = self.runs
+        while len(runs) > 1:
+            n = len(runs) - 2
+            if ((n > 0 and runs[n - 1][1] <= runs[n][1] + runs[n + 1][1]) or
+                    (n > 1 and runs[n - 2][1] <= runs[n - 1][1] + runs[n][1])):
+                if runs[n - 1][1] < runs[n + 1][1]:
+                    n -= 1
+                yield from self.merge_at(n)
+            elif runs[n][1] <= runs[n + 1][1]:
+                yield from self.merge_at(n)
+            else:
+                break
+
+    def merge_force_collapse(self):
+        runs = self.runs
+        while len(runs) > 1:
+            n = len(runs) - 2
+            if n > 0 and runs[n - 1][1] < runs[n + 1][1]:
+                n -= 1
+            yield from self.merge_at(n)
+
+    def merge_at(self, i):
+        """Merge runs i and i + 1 of the stack"""
+        arr = self.arr
+        base_a, len_a = self.runs[i]
+        base_b, len_b = self.runs[i + 1]
+        self.runs[i] = (base_a, len_a + len_b)
+        del self.runs[i + 1]
+        yield (HIGHLIGHT, base_a, base_b + len_b)
+
+        # Items of A before B's first and of B after A's last are in place
+        k = yield from _gallop_right(arr[base_b], base_b, arr, base_a, len_a, 0)
+        base_a += k
+        len_a -= k
+        if len_a == 0:
+            return
+        len_b = yield from _gallop_left(arr[base_a + len_a - 1], base_a + len_a - 1,
+                                        arr, base_b, len_b, len_b - 1)
+        if len_b == 0:
+            return
+        if len_a <= len_b:
+            yield from self.merge_lo(base_a, len_a, base_b, len_b)
+        else:
+            yield from self.merge_hi(base_a, len_a, base_b, len_b)
+
+    def merge_lo(self, base_a, len_a, base_b, len_b):
+        """Merge left to right, with A (the shorter run) copied out"""
+        arr = self.arr
+        yield (ALLOC, len_a, 0)
+        tmp = [arr[base_a + t] for t in range(len_a)]
+        dest, pa, pb = base_a, 0, base_b
+        min_gallop = self.min_gallop
+
+        # B's first item is known to go first
+        arr[dest] = arr[pb]
+        yield (WRITE, dest, arr[dest])
+        dest += 1
+        pb += 1
+        len_b -= 1
+
+        while len_b and len_a > 1:
+            # One item at a time until a run wins min_gallop times in a row
+            count_a = count_b = 0
+            while True:
+                yield (COMPARE, pb, base_a + pa)
+                if arr[pb] < tmp[pa]:
+                    arr[dest] = arr[pb]
+                    yield (WRITE, dest, arr[dest])
+                    dest += 1
+                    pb += 1
+                    len_b -= 1
+                    count_b += 1
+                    count_a = 0
+                    if len_b == 0 or count_b >= min_gallop:
+                        break
+                else:
+                    arr[dest] = tmp[pa]
+                    yield (WRITE, dest, tmp[pa])
+                    dest += 1
+                    pa += 1
+                    len_a -= 1
+                    count_a += 1
+                    count_b = 0
+                    if len_a == 1 or count_a >= min_gallop:
+                        break
+            if len_b == 0 or len_a == 1:
+                break
+
+            # Gallop: copy whole stretches while that keeps paying off
+            min_gallop += 1
+            while True:
+                min_gallop -= min_gallop > 1
+                count_a = yield from _gallop_right(arr[pb], pb, tmp, pa, len_a, 0, base_a)
+                for _ in range(count_a):
+                    arr[dest] = tmp[pa]
+                    yield (WRITE, dest, tmp[pa])
+                    dest += 1
+                    pa += 1
+                len_a -= count_a
+                if len_a <= 1:
+                    break
+                arr[dest] = arr[pb]
+                yield (WRITE, dest, arr[dest])
+                dest += 1
+                pb += 1
+                len_b -= 1
+                if len_b == 0:
+                    break
+
+                count_b = yield from _gallop_left(tmp[pa], base_a + pa, arr, pb, len_b, 0)
+                for _ in range(count_b):
+                    arr[dest] = arr[pb]
+                    yield (WRITE, dest, arr[dest])
+                    dest += 1
+                    pb += 1
+                len_b -= count_b
+                if len_b == 0:
+                    break
+                arr[dest] = tmp[pa]
+                yield (WRITE, dest, tmp[pa])
+                dest += 1
+                pa += 1
+                len_a -= 1
+                if len_a == 1:
+                    break
+                if count_a < MIN_GALLOP and count_b < MIN_GALLOP:
+                    break
+            if len_b == 0 or len_a <= 1:
+                break
+            min_gallop += 1  # Penalty for leaving gallop mode
+        self.min_gallop = max(1, min_gallop)
+
+        if len_a == 1 and len_b:
+            # A's last item belongs after the rest of B
+            for _ in range(len_b):
+                arr[dest] = arr[pb]
+                yield (WRITE, dest, arr[dest])
+                dest += 1
+                pb += 1
+            arr[dest] = tmp[pa]
+            yield (WRITE, dest, tmp[pa])
+        else:
+            for _ in range(len_a):
+                arr[dest] = tmp[pa]
+                yield (WRITE, dest, tmp[pa])
+                dest += 1
+                pa += 1
+
+    def merge_hi(self, base_a, len_a, base_b, len_b):
+        """Merge right to left, with B (the shorter run) copied out"""
+        arr = self.arr
+        yield (ALLOC, len_b, 0)
+        tmp = [arr[base_b + t] for t in range(len_b)]
+        dest, pa, pb = base_b + len_b - 1, base_a + len_a - 1, len_b - 1
+        min_gallop = self.min_gallop
+
+        # A's last item is known to go last
+        arr[dest] = arr[pa]
+        yield (WRITE, dest, arr[dest])
+        dest -= 1
+        pa -= 1
+        len_a -= 1
+
+        while len_a and len_b > 1:
+            count_a = count_b = 0
+            while True:
+                yield (COMPARE, base_b + pb, pa)
+                if tmp[pb] < arr[pa]:
+                    arr[dest] = arr[pa]
+                    yield (WRITE, dest, arr[dest])
+                    dest -= 1
+                    pa -= 1
+                    len_a -= 1
+                    count_a += 1
+                    count_b = 0
+                    if len_a == 0 or count_a >= min_gallop:
+                        break
+                else:
+                    arr[dest] = tmp[pb]
+                    yield (WRITE, dest, tmp[pb])
+                    dest -= 1
+                    pb -= 1
+                    len_b -= 1
+                    count_b += 1
+                    count_a = 0
+                    if len_b == 1 or count_b >= min_gallop:
+                        break
+            if len_a == 0 or len_b == 1:
+                break
+
+            min_gallop += 1
+            while True:
+                min_gallop -= min_gallop > 1
+                k = yield from _gallop_right(tmp[pb], base_b + pb, arr, base_a, len_a, len_a - 1)
+                count_a = len_a - k
+                for _ in range(count_a):
+                    arr[dest] = arr[pa]
+                    yield (WRITE, dest, arr[dest])
+                    dest -= 1
+                    pa -= 1
+                len_a -= count_a
+                if len_a == 0:
+                    break
+                arr[dest] = tmp[pb]
+                yield (WRITE, dest, tmp[pb])
+                dest -= 1
+                pb -= 1
+                len_b -= 1
+                if len_b == 1:
+                    break
+
+                k = yield from _gallop_left(arr[pa], pa, tmp, 0, len_b, len_b - 1, base_b)
+                count_b = len_b - k
+                for _ in range(count_b):
+                    arr[dest] = tmp[pb]
+                    yield (WRITE, dest, tmp[pb])
+                    dest -= 1
+                    pb -= 1
+                len_b -= count_b
+                if len_b <= 1:
+                    break
+                arr[dest] = arr[pa]
+                yield (WRITE, dest, arr[dest])
+                dest -= 1
+                pa -= 1
+                len_a -= 1
+                if len_a == 0:
+                    break
+                if count_a < MIN_GALLOP and count_b < MIN_GALLOP:
+                    break
+            if len_a == 0 or len_b <= 1:
+                break
+            min_gallop += 1
+        self.min_gallop = max(1, min_gallop)
+
+        if len_b == 1 and len_a:
+            # B's first item belongs before the rest of A
+            for _ in range(len_a):
+                arr[dest] = arr[pa]
+                yield (WRITE, dest, arr[dest])
+                dest -= 1
+                pa -= 1
+            arr[dest] = tmp[pb]
+            yield (WRITE, dest, tmp[pb])
+        else:
+            for _ in range(len_b):
+                arr[dest] = tmp[pb]
+                yield (WRITE, dest, tmp[pb])
+                dest -= 1
+                pb -= 1
+
+
+def tim_sort(arr):
+    yield from TimSort(arr).sort()
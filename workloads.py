@@ -0,0 +1,148 @@
+"""Seeded input distributions for the visualizers and headless runs.
+
+Every distribution produces values in 1..n.  ``generate()`` returns a whole
+NumPy array; ``stream()`` yields it in chunks so inputs far larger than
+memory can be produced without a Python list (or even the full array)
+ever existing.  The same (name, n, seed, chunk_size) always gives the same
+data, and generate() is exactly stream() with a single chunk.
+"""
+import numpy as np
+
+DEFAULT_CHUNK = 1 << 20
+
+
+def _positions(start, stop):
+    return np.arange(start, stop, dtype=np.int64)
+
+
+class _Permutation:
+    """A seeded bijection of 0..n-1 (Feistel network with cycle walking).
+
+    It lets a random permutation be produced chunk by chunk: element i of
+    the shuffled array is simply permute(i).
+    """
+
+    def __init__(self, n, rng):
+        self.n = n
+        bits = max(2, int(n - 1).bit_length())
+        self.half = (bits + 1) // 2
+        self.mask = np.uint64((1 << self.half) - 1)
+        self.keys = rng.integers(0, 1 << 32, size=4, dtype=np.uint64)
+
+    def _encrypt(self, x):
+        left, right = x >> np.uint64(self.half), x & self.mask
+        for key in self.keys:
+            mixed = (right * np.uint64(0x9E3779B1) + key) & np.uint64(0xFFFFFFFF)
+            mixed ^= mixed >> np.uint64(7)
+            left, right = right, (left ^ mixed) & self.mask
+        return (left << np.uint64(self.half)) | right
+
+    def __call__(self, positions):
+        x = self._encrypt(positions.astype(np.uint64))
+        outside = x >= self.n
+        while outside.any():
+            x[outside] = self._encrypt(x[outside])
+            outside = x >= self.n
+        return x.astype(np.int64)
+
+
+def _sorted(start, stop, n, rng, state):
+    return _positions(start, stop) + 1
+
+
+def _reversed(start, stop, n, rng, state):
+    return n - _positions(start, stop)
+
+
+def _random(start, stop, n, rng, state):
+    if "permutation" not in state:
+        state["permutation"] = _Permutation(n, rng)
+    return state["permutation"](_positions(start, stop)) + 1
+
+
+def _nearly_sorted(start, stop, n, rng, state, swaps=None):
+    """Sorted, then `swaps` random transpositions (default ~1% of n)"""
+    values = _positions(start, stop) + 1
+    if swaps is None:
+        swaps = max(1, n // 100)
+    # Spread the swaps over the chunks in proportion to their size
+    count = rng.binomial(swaps, (stop - start) / n) if stop - start < n else swaps
+    for i, j in rng.integers(0, stop - start, size=(count, 2)):
+        values[i], values[j] = values[j], values[i]
+    return values
+
+
+def _few_unique(start, stop, n, rng, state, unique=8):
+    levels = np.linspace(1, n, unique).astype(np.int64)
+    return levels[rng.integers(0, unique, size=stop - start)]
+
+
+def _sawtooth(start, stop, n, rng, state, teeth=4):
+    tooth = max(1, -(-n // teeth))
+    return (_positions(start, stop) % tooth) * teeth + 1
+
+
+def _organ_pipe(start, stop, n, rng, state):
+    """Ascending to the middle, then descending"""
+    i = _positions(start, stop)
+    return np.minimum(2 * i + 1, 2 * (n - i)).clip(1, n)
+
+
+def _runs(start, stop, n, rng, state, mean_run=32):
+    """Ascending runs of random (geometric) length with random values"""
+    values = rng.integers(1, n + 1, size=stop - start)
+    bounds = np.cumsum(rng.geometric(1 / mean_run, size=(stop - start) // mean_run * 2 + 2))
+    bounds = np.concatenate(([0], bounds[bounds < stop - start], [stop - start]))
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        values[lo:hi].sort()
+    return values
+
+
+def _gaussian(start, stop, n, rng, state):
+    values = rng.normal(n / 2, n / 6, size=stop - start)
+    return np.rint(values).clip(1, n).astype(np.int64)
+
+
+def _duplicates(start, stop, n, rng, state):
+    """Values from a pool of ~sqrt(n) keys with Zipf-like frequencies"""
+    pool = max(2, int(np.sqrt(n)))
+    if "keys" not in state:
+        state["keys"] = np.sort(rng.choice(n, size=min(pool, n), replace=False) + 1)
+    keys = state["keys"]
+    ranks = np.minimum(rng.zipf(1.5, size=stop - start), len(keys)) - 1
+    return keys[ranks]
+
+
+DISTRIBUTIONS = {
+    "random": _random,
+    "sorted": _sorted,
+    "reversed": _reversed,
+    "nearly-sorted": _nearly_sorted,
+    "few-unique": _few_unique,
+    "sawtooth": _sawtooth,
+    "organ-pipe": _organ_pipe,
+    "runs": _runs,
+    "gaussian": _gaussian,
+    "duplicates": _duplicates,
+}
+
+
+def stream(name, n, seed=None, chunk_size=DEFAULT_CHUNK, **params):
+    """Yield the distribution's n values as int64 arrays of chunk_size"""
+    make = DISTRIBUTIONS[name]
+    rng = np.random.default_rng(seed)
+    state = {}
+    for start in range(0, n, chunk_size):
+        yield make(start, min(start + chunk_size, n), n, rng, state, **params)
+
+
+def generate(name, n, seed=None, **params):
+    """The whole distribution as one int64 NumPy array"""
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    return next(stream(name, n, seed, chunk_size=n, **params))
+
+
+def generate_list(name, n, seed=None, **params):
+    """generate() as a plain list, for the list-based visualizers"""
+    return generate(name, n, seed, **params).tolist()